@@ -8,7 +8,6 @@ from animations.params_ani import plot_animated_Pe
 from animations.residual_ani import plot_animated_residuals
 from optimizator.optimizer import run_optimization
 from regression.find_intervals import get_boundaries
-from regression.global_models import model_ws, model_ms
 from animations.constants import COMMON_CONSTANTS
 
 boundary_dict = COMMON_CONSTANTS['boundaries']
@@ -23,7 +22,7 @@ def main():
     x_data, y_data = generate_data(boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, N)
     y_data_noize = noize_data(y_data, sigma)
 
-    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, N, sigma, A, model_ws, model_ms)
+    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, N, sigma, A)
 
     Pe_opt, df_history = run_optimization(x_data, y_data, found_left, found_right,
                                           boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A)
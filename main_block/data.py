@@ -1,5 +1,5 @@
 import numpy as np
-from main_block.main_functions import main_func
+from main_block.model_cache import cached_main_func
 from scipy.signal import medfilt
 from pathlib import Path
 
@@ -27,9 +27,15 @@ def data_norm(x_data, y_data_noize):
     return z_norm, T_noisy_norm
 
 
+# Оценка уровня шума по MAD вторых разностей (для гладкого профиля вторые разности - почти чистый шум),
+# снизу ограничена min_level
+def noise_level(y_data, min_level=1e-12):
+    return max(np.median(np.abs(np.diff(y_data, 2))) / 0.6745 / np.sqrt(6), min_level)
+
+
 def generate_data(left_boundaries, right_boundaries, Pe, TG0, atg, A, N):
     x_data = np.linspace(min(left_boundaries), max(right_boundaries), N)
-    y_data = main_func(x_data, TG0, atg, A, Pe, left_boundaries, right_boundaries)
+    y_data = cached_main_func(x_data, TG0, atg, A, Pe, left_boundaries, right_boundaries)
     return x_data, y_data
 
 
@@ -0,0 +1,47 @@
+import numpy as np
+from main_block.main_functions import TsGLin_numpy, sorted_segments, restore_order, Z_INF
+
+# Модельная кривая с кэшем по префиксу: при изменении Pe_j участки 0 ... j-1 и плато перед ними
+# не пересчитываются, заново считаются только участки j ... k-1
+class IncrementalTsGLin:
+    def __init__(self, z, TG0, atg, A, left_boundaries, right_boundaries):
+        self.TG0 = TG0
+        self.atg = atg
+        self.A = A
+        self.left_boundaries = [float(b) for b in left_boundaries]
+        self.right_boundaries = [float(b) for b in right_boundaries]
+        self.z, self.order, self.segment_bounds = sorted_segments(z, self.left_boundaries, self.right_boundaries)
+
+        n = len(self.right_boundaries)
+        self.Pe = None
+        self.TsGLin_array = np.zeros(n + 1)
+        self.result = np.full(self.z.shape, np.nan)
+        self.recomputed_segments = 0
+
+    def first_changed_segment(self, Pe):
+        if self.Pe is None:
+            return 0
+        changed = np.flatnonzero(Pe != self.Pe)
+        return int(changed[0]) if changed.size else len(Pe)
+
+    def update_segment(self, i, Pe_i):
+        zl = self.left_boundaries[i]
+        Tl = self.TsGLin_array[i]
+        self.TsGLin_array[i + 1] = TsGLin_numpy(self.right_boundaries[i], Z_INF, self.TG0, self.atg, self.A,
+                                                Pe_i, zl, Tl)
+
+        start, stop, plateau_stop = self.segment_bounds[i]
+        self.result[start:stop] = TsGLin_numpy(self.z[start:stop], Z_INF, self.TG0, self.atg, self.A, Pe_i, zl, Tl)
+        self.result[stop:plateau_stop] = self.TsGLin_array[i + 1]
+        self.recomputed_segments += 1
+
+    def evaluate(self, Pe):
+        Pe = np.asarray(Pe, dtype=float)
+        first = self.first_changed_segment(Pe)
+        for i in range(first, len(Pe)):
+            self.update_segment(i, Pe[i])
+        self.Pe = Pe.copy()
+
+        if self.order is None:
+            return self.result.copy()
+        return restore_order(self.result, self.order)
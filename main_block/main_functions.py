@@ -1,8 +1,14 @@
 import mpmath
 import numpy as np
 
-# Решение уравнения теплопроводности
-def TsGLin(z, zInf, TG0, atg, A, Pe, zl, Tl):
+# Полубесконечный пласт: по умолчанию используется асимптотика zInf -> inf (см. TsGLin_asymptotic_error).
+# Она верна только при Pe >= 0: при Pe < 0 отброшенное слагаемое ~ exp(-A (zInf - zl) / |Pe|) не мало,
+# и для таких Pe вместо zInf = inf берется конечная граница Z_INF_FINITE
+Z_INF = np.inf
+Z_INF_FINITE = 100000
+
+# Решение уравнения теплопроводности (эталонный расчет в mpmath)
+def TsGLin_mpmath(z, zInf, TG0, atg, A, Pe, zl, Tl):
     z = [mpmath.mpf(z_i) for z_i in z]
     zInf = mpmath.mpf(zInf)
     TG0 = mpmath.mpf(TG0)
@@ -12,6 +18,14 @@ def TsGLin(z, zInf, TG0, atg, A, Pe, zl, Tl):
     zl = mpmath.mpf(zl)
     Tl = mpmath.mpf(Tl)
 
+    if mpmath.isinf(zInf) and Pe < 0:
+        zInf = mpmath.mpf(Z_INF_FINITE)
+    if mpmath.isinf(zInf):
+        decay = (mpmath.sqrt(4 * A + Pe ** 2) - Pe) / 2
+        return [float(TG0 + atg * z_val - atg * Pe / A
+                      + (Tl - TG0 - atg * zl + atg * Pe / A) * mpmath.exp(-decay * (z_val - zl)))
+                for z_val in z]
+
     results = []
     for z_val in z:
         result = 1 / ((-1 + mpmath.exp(mpmath.sqrt(4 * A + Pe ** 2) * (zInf - zl))) * A) * mpmath.exp(
@@ -34,12 +48,180 @@ def TsGLin(z, zInf, TG0, atg, A, Pe, zl, Tl):
     return results
 
 
-def calculate_TsGLin_array(right_boundaries, TG0, atg, A, Pe, left_boundaries, TsGLin_init):
+# То же решение в float64: экспоненты перегруппированы так, что все показатели <= 0 при zl <= z <= zInf
+def TsGLin_numpy(z, zInf, TG0, atg, A, Pe, zl, Tl):
+    z = np.asarray(z, dtype=float)
+    return TsGLin_shifted(z, z - zl, zInf - zl, TG0, atg, A, Pe, zl, Tl)
+
+
+# Тело TsGLin_numpy по заранее посчитанным смещениям u = z - zl и a = zInf - zl.
+# return_condition=True дополнительно возвращает число обусловленности суммы слагаемых числителя
+def TsGLin_shifted(z, u, a, TG0, atg, A, Pe, zl, Tl, return_condition=False):
+    s = np.sqrt(4 * A + Pe ** 2)
+    decay, growth = exponent_rates(s, A, Pe)
+
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        asymptotic, a = asymptotic_mask(a, Pe, zl)
+        if np.all(asymptotic):
+            # zInf -> inf при Pe >= 0: слагаемые с exp(-s * a) обращаются в ноль
+            denominator = A
+            terms = (
+                TG0 * A - atg * Pe + atg * A * z,
+                (-TG0 * A + Tl * A + atg * (Pe - A * zl)) * np.exp(-decay * u),
+            )
+        else:
+            denominator = -A * np.expm1(-s * a)
+            terms = (
+                (TG0 * A - atg * Pe + atg * A * z) * -np.expm1(-s * a),
+                (-TG0 * A + Tl * A + atg * (Pe - A * zl)) * np.exp(-decay * u),
+                (TG0 * A - Tl * A - atg * Pe + atg * A * zl) * np.exp(growth * u - s * a),
+                atg * Pe * np.exp(growth * (u - a)),
+                -atg * Pe * np.exp(-decay * u - growth * a),
+            )
+            if np.any(asymptotic):
+                # смешанный набор Pe: в асимптотических точках остаются первые два слагаемых со знаменателем A
+                denominator = np.where(asymptotic, A, denominator)
+                terms = (np.where(asymptotic, TG0 * A - atg * Pe + atg * A * z, terms[0]), terms[1]) + \
+                        tuple(np.where(asymptotic, 0.0, term) for term in terms[2:])
+        numerator = sum(terms)
+        result = numerator / denominator
+        if not return_condition:
+            return result
+        # относительно max(|T|, 1), чтобы точки с T около нуля не считались плохо обусловленными
+        condition = sum(np.abs(term) for term in terms) / np.maximum(np.abs(numerator), np.abs(denominator))
+    return result, condition
+
+
+# Показатели decay = (s - Pe) / 2 и growth = (s + Pe) / 2 без сокращения (decay * growth = A):
+# меньший из них считается через A / больший
+def exponent_rates(s, A, Pe):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decay = np.where(Pe >= 0, 2 * A / (s + Pe), 0.5 * (s - Pe))
+        growth = np.where(Pe >= 0, 0.5 * (s + Pe), 2 * A / (s - Pe))
+    return decay, growth
+
+
+# Точки, где используется асимптотика zInf -> inf (a = inf и Pe >= 0), и a с заменой zInf = inf
+# на Z_INF_FINITE там, где Pe < 0
+def asymptotic_mask(a, Pe, zl):
+    infinite = np.isinf(a)
+    asymptotic = infinite & (Pe >= 0)
+    if np.any(infinite & ~asymptotic):
+        a = np.where(asymptotic | ~infinite, a, Z_INF_FINITE - zl)
+    return asymptotic, a
+
+
+# Оценка сверху |T(zInf) - T(inf)| для zl <= z, при (s + Pe)(z - zl) / 2 < s (zInf - zl):
+# (|c6| e^{-s a} + |c5| e^{(s + Pe) u / 2 - s a}
+#  + atg |Pe| (e^{(s + Pe)(u - a) / 2} + e^{-s a / 2 - s u / 2 + Pe (u - a) / 2})) / (A (1 - e^{-s a})),
+# где u = z - zl, a = zInf - zl, s = sqrt(4A + Pe^2). При Pe >= 0 и zInf = 1e5 оценка ниже машинного нуля
+# для A >~ 1e-6; при Pe < 0 она ~ exp(-A a / |Pe|) и не мала, поэтому там асимптотика не используется
+def TsGLin_asymptotic_error(z, zInf, TG0, atg, A, Pe, zl, Tl):
+    z = np.asarray(z, dtype=float)
+    s = np.sqrt(4 * A + Pe ** 2)
+    decay, growth = exponent_rates(s, A, Pe)
+    u = z - zl
+    a = zInf - zl
+    c5 = TG0 * A - Tl * A - atg * Pe + atg * A * zl
+    c6 = -TG0 * A + Tl * A + atg * (Pe - A * zl)
+    return (
+        np.abs(c6) * np.exp(-s * a)
+        + np.abs(c5) * np.exp(growth * u - s * a)
+        + atg * np.abs(Pe) * (np.exp(growth * (u - a)) + np.exp(-decay * u - growth * a))
+    ) / (-A * np.expm1(-s * a))
+
+
+# Частные производные TsGLin_numpy по Pe и по Tl (решение линейно по Tl)
+def TsGLin_derivatives(z, zInf, TG0, atg, A, Pe, zl, Tl):
+    z = np.asarray(z, dtype=float)
+    s = np.sqrt(4 * A + Pe ** 2)
+    decay, growth = exponent_rates(s, A, Pe)
+    ds = Pe / s
+    u = z - zl
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        asymptotic, a = asymptotic_mask(zInf - zl, Pe, zl)
+        c3 = TG0 * A - atg * Pe + atg * A * z
+        c6 = -TG0 * A + Tl * A + atg * (Pe - A * zl)
+        e6 = np.exp(-decay * u)
+        if np.any(asymptotic):
+            asymptotic_dPe = (-atg + atg * e6 + c6 * e6 * u * decay / s) / A
+            if np.all(asymptotic):
+                return asymptotic_dPe, e6
+
+        E = -np.expm1(-s * a)
+        dE = ds * a * np.exp(-s * a)
+        c5 = TG0 * A - Tl * A - atg * Pe + atg * A * zl
+        e5 = np.exp(growth * u - s * a)
+        e1 = np.exp(growth * (u - a))
+        e2 = np.exp(-decay * u - growth * a)
+
+        denominator = A * E
+        result = (c3 * E + c6 * e6 + c5 * e5 + atg * Pe * (e1 - e2)) / denominator
+        d_numerator = (
+            -atg * E + c3 * dE
+            + atg * e6 + c6 * e6 * u * decay / s
+            - atg * e5 + c5 * e5 * (growth / s * u - ds * a)
+            + atg * (e1 - e2)
+            + atg * Pe * e1 * growth / s * (u - a)
+            - atg * Pe * e2 * (decay * u - growth * a) / s
+        )
+        dT_dPe = (d_numerator - result * A * dE) / denominator
+        dT_dTl = (e6 - e5) / E
+        if np.any(asymptotic):
+            dT_dPe = np.where(asymptotic, asymptotic_dPe, dT_dPe)
+            dT_dTl = np.where(asymptotic, e6, dT_dTl)
+    return dT_dPe, dT_dTl
+
+
+# Точки, где сокращение слагаемых в float64 съедает больше rtol относительной точности, считаются в mpmath.
+# При Pe < 0 и A (zInf - zl) / |Pe| < UNCONDITIONED_DECAY слагаемые с exp(-A (zInf - zl) / |Pe|) не малы
+# и число обусловленности их не отражает - такой участок целиком считается в mpmath
+UNCONDITIONED_DECAY = 40
+
+
+def TsGLin_adaptive(z, zInf, TG0, atg, A, Pe, zl, Tl, rtol=1e-12):
+    z = np.asarray(z, dtype=float)
+    result, condition = TsGLin_shifted(z, z - zl, zInf - zl, TG0, atg, A, Pe, zl, Tl, return_condition=True)
+    slow = ~(condition * np.finfo(float).eps <= rtol)
+    if Pe < 0 and A * ((Z_INF_FINITE if np.isinf(zInf) else zInf) - zl) / -Pe < UNCONDITIONED_DECAY:
+        slow = np.ones_like(slow, dtype=bool)
+    if np.any(slow):
+        result = np.array(result, dtype=float, ndmin=1)
+        with mpmath.workdps(30):
+            result[np.atleast_1d(slow)] = TsGLin_mpmath(np.atleast_1d(z)[np.atleast_1d(slow)], zInf, TG0, atg, A,
+                                                        Pe, zl, Tl)
+    return result, int(np.count_nonzero(slow))
+
+
+def TsGLin(z, zInf, TG0, atg, A, Pe, zl, Tl, precise=False):
+    if precise == 'auto':
+        return TsGLin_adaptive(z, zInf, TG0, atg, A, Pe, zl, Tl)[0]
+    if precise:
+        return np.array(TsGLin_mpmath(z, zInf, TG0, atg, A, Pe, zl, Tl))
+    return TsGLin_numpy(z, zInf, TG0, atg, A, Pe, zl, Tl)
+
+
+def calculate_TsGLin_array(right_boundaries, TG0, atg, A, Pe, left_boundaries, TsGLin_init, precise=False,
+                           zInf=Z_INF):
     n = len(Pe)
     TsGLin_array = [TsGLin_init]
     for i in range(n):
-        TsGLin_current = TsGLin([right_boundaries[i]], 1000000, TG0, atg, A, Pe[i], left_boundaries[i], TsGLin_array[i])
-        TsGLin_array.append(TsGLin_current[0])
+        TsGLin_current = TsGLin([right_boundaries[i]], zInf, TG0, atg, A, Pe[i], left_boundaries[i], TsGLin_array[i],
+                                precise)
+        TsGLin_array.append(float(TsGLin_current[0]))
+    return TsGLin_array
+
+
+# Пакетный вариант: строки Pe_batch - независимые наборы Pe, результат (M, k + 1)
+def calculate_TsGLin_array_batch(right_boundaries, TG0, atg, A, Pe_batch, left_boundaries, TsGLin_init):
+    Pe_batch = np.atleast_2d(np.asarray(Pe_batch, dtype=float))
+    m, n = Pe_batch.shape
+    TsGLin_array = np.empty((m, n + 1))
+    TsGLin_array[:, 0] = TsGLin_init
+    for i in range(n):
+        TsGLin_array[:, i + 1] = TsGLin_numpy(right_boundaries[i], Z_INF, TG0, atg, A, Pe_batch[:, i],
+                                              left_boundaries[i], TsGLin_array[:, i])
     return TsGLin_array
 
 
@@ -51,30 +233,139 @@ def reconstruct_Pe_list(params, Pe_1):
     return Pe_values
 
 
+# Разбиение отсортированной сетки z на участки [l0, r0), [r0, l1), [l1, r1), ...
+def split_into_segments(z, left_boundaries, right_boundaries):
+    breaks = np.column_stack((left_boundaries, right_boundaries)).ravel()
+    return np.searchsorted(z, breaks, side='left')
+
+
+# Сетка z по возрастанию (order - перестановка сортировки или None, если z уже упорядочена) и границы
+# участков в ней: для интервала i - тройка (start, stop, plateau_stop), интервал [start, stop),
+# плато после него [stop, plateau_stop) до начала следующего интервала или до конца сетки
+def sorted_segments(z, left_boundaries, right_boundaries):
+    z = np.asarray(z, dtype=float)
+    order = None
+    if np.any(z[1:] < z[:-1]):
+        order = np.argsort(z, kind='stable')
+        z = z[order]
+
+    n = len(right_boundaries)
+    positions = split_into_segments(z, left_boundaries, right_boundaries)
+    segment_bounds = [(positions[2 * i], positions[2 * i + 1], positions[2 * i + 2] if i < n - 1 else len(z))
+                      for i in range(n)]
+    return z, order, segment_bounds
+
+
+# Возврат значений, посчитанных на отсортированной сетке, к исходному порядку точек (ось axis)
+def restore_order(result, order, axis=-1, out=None):
+    if order is None:
+        return result
+    unsorted = np.empty_like(result) if out is None else out
+    np.moveaxis(unsorted, axis, 0)[order] = np.moveaxis(result, axis, 0)
+    return unsorted
+
+
+# Заполнение out значениями модельной кривой по уже посчитанным температурам на плато
+def fill_main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, TsGLin_array, out, precise=False,
+                   zInf=Z_INF):
+    z, order, segment_bounds = sorted_segments(z, left_boundaries, right_boundaries)
+    result = out if order is None else np.empty(z.shape)
+    result[:segment_bounds[0][0]] = np.nan
+
+    for i, (start, stop, plateau_stop) in enumerate(segment_bounds):
+        result[start:stop] = TsGLin(z[start:stop], zInf, TG0, atg, A, Pe[i], left_boundaries[i], TsGLin_array[i],
+                                    precise)
+        result[stop:plateau_stop] = TsGLin_array[i + 1]
+
+    return restore_order(result, order, out=out)
+
+
 # Модельная кривая
-def main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries):
+def main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, precise=False, zInf=Z_INF):
+    if precise == 'auto':
+        return main_func_adaptive(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, zInf=zInf)[0]
+
+    z = np.asarray(z, dtype=float)
+    TsGLin_array = calculate_TsGLin_array(right_boundaries, TG0, atg, A, Pe, left_boundaries, 0, precise, zInf)
+    return fill_main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, TsGLin_array, np.empty(z.shape),
+                          precise, zInf)
+
+
+# Модельная кривая блоками по chunk_size глубин для очень длинных сеток (DTS): пиковая память
+# ограничена размером блока, результат пишется в out (например, np.memmap) или в новый массив
+def main_func_chunked(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, out=None, chunk_size=65536,
+                      precise=False, zInf=Z_INF):
+    if out is None:
+        out = np.empty(len(z))
+    TsGLin_array = calculate_TsGLin_array(right_boundaries, TG0, atg, A, Pe, left_boundaries, 0, precise, zInf)
+    for start in range(0, len(z), chunk_size):
+        stop = min(start + chunk_size, len(z))
+        fill_main_func(z[start:stop], TG0, atg, A, Pe, left_boundaries, right_boundaries, TsGLin_array,
+                       out[start:stop], precise, zInf)
+    return out
+
+
+# Модельные кривые сразу для M наборов Pe (матрица M x k), результат M x N
+def main_func_batch(z, TG0, atg, A, Pe_batch, left_boundaries, right_boundaries):
+    Pe_batch = np.atleast_2d(np.asarray(Pe_batch, dtype=float))
+    z, order, segment_bounds = sorted_segments(z, left_boundaries, right_boundaries)
+    TsGLin_array = calculate_TsGLin_array_batch(right_boundaries, TG0, atg, A, Pe_batch, left_boundaries, 0)
+    result = np.full((Pe_batch.shape[0], len(z)), np.nan)
+
+    for i, (start, stop, plateau_stop) in enumerate(segment_bounds):
+        result[:, start:stop] = TsGLin_numpy(z[start:stop], Z_INF, TG0, atg, A, Pe_batch[:, i, None],
+                                             left_boundaries[i], TsGLin_array[:, i, None])
+        result[:, stop:plateau_stop] = TsGLin_array[:, i + 1, None]
+
+    return restore_order(result, order)
+
+
+# Модельная кривая в float64 с переходом на mpmath только в плохо обусловленных точках,
+# возвращает также число точек (включая значения на плато), посчитанных в mpmath
+def main_func_adaptive(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, rtol=1e-12, zInf=Z_INF):
+    z, order, segment_bounds = sorted_segments(z, left_boundaries, right_boundaries)
+    n = len(right_boundaries)
+    slow_points = 0
+    TsGLin_array = [0]
+    for i in range(n):
+        TsGLin_current, slow = TsGLin_adaptive(right_boundaries[i], zInf, TG0, atg, A, Pe[i], left_boundaries[i],
+                                               TsGLin_array[i], rtol)
+        TsGLin_array.append(float(np.ravel(TsGLin_current)[0]))
+        slow_points += slow
+
+    result = np.full(z.shape, np.nan)
+    for i, (start, stop, plateau_stop) in enumerate(segment_bounds):
+        result[start:stop], slow = TsGLin_adaptive(z[start:stop], zInf, TG0, atg, A, Pe[i], left_boundaries[i],
+                                                   TsGLin_array[i], rtol)
+        slow_points += slow
+        result[stop:plateau_stop] = TsGLin_array[i + 1]
+
+    return restore_order(result, order), slow_points
+
+
+# Якобиан модельной кривой по Pe: матрица N x k, столбец j - dT/dPe_j
+def main_func_jacobian(z, TG0, atg, A, Pe, left_boundaries, right_boundaries):
+    z, order, segment_bounds = sorted_segments(z, left_boundaries, right_boundaries)
+    n = len(right_boundaries)
     TsGLin_array = calculate_TsGLin_array(right_boundaries, TG0, atg, A, Pe, left_boundaries, 0)
-    result = np.full_like(z, np.nan, dtype=float)
-    result = np.where(
-        (z >= left_boundaries[0]) & (z < right_boundaries[0]),
-        TsGLin(z, 1000000, TG0, atg, A, Pe[0], left_boundaries[0], TsGLin_array[0]),
-        result
-    )
-
-    for i in range(len(right_boundaries) - 1):
-        result = np.where(
-            (z >= right_boundaries[i]) & (z < left_boundaries[i + 1]),
-            TsGLin_array[i + 1],
-            result
-        )
-        result = np.where(
-            (z >= left_boundaries[i + 1]) & (z < right_boundaries[i + 1]),
-            TsGLin(z, 100000, TG0, atg, A, Pe[i + 1], left_boundaries[i + 1], TsGLin_array[i + 1]),
-            result
-        )
+    jacobian = np.full((len(z), len(Pe)), np.nan)
 
-    result = np.where(z >= right_boundaries[-1], TsGLin_array[-1], result)
-    return result
+    # Температура на плато i зависит от Pe_0 ... Pe_{i-1}: строки plateau_grad нижнетреугольные
+    plateau_grad = np.zeros((n + 1, len(Pe)))
+    for i in range(n):
+        dT_dPe, dT_dTl = TsGLin_derivatives(right_boundaries[i], Z_INF, TG0, atg, A, Pe[i],
+                                            left_boundaries[i], TsGLin_array[i])
+        plateau_grad[i + 1] = dT_dTl * plateau_grad[i]
+        plateau_grad[i + 1, i] += dT_dPe
+
+    for i, (start, stop, plateau_stop) in enumerate(segment_bounds):
+        dT_dPe, dT_dTl = TsGLin_derivatives(z[start:stop], Z_INF, TG0, atg, A, Pe[i], left_boundaries[i],
+                                            TsGLin_array[i])
+        jacobian[start:stop] = np.outer(dT_dTl, plateau_grad[i])
+        jacobian[start:stop, i] += dT_dPe
+        jacobian[stop:plateau_stop] = plateau_grad[i + 1]
+
+    return restore_order(jacobian, order, axis=0)
 
 
 def geoterma(z, TG0, atg):
@@ -83,3 +374,73 @@ def geoterma(z, TG0, atg):
 
 def debit(Pe, lw=0.6, rw=0.1, cw=4200, row=1000):
     return 24 * 3600 * (Pe * lw * np.pi * rw) / (cw * row)
+
+
+# тестовый пример: сверка float64 с эталонным расчетом mpmath
+def main():
+    left_boundaries = [0, 150, 300, 450]
+    right_boundaries = [100, 250, 350, 520]
+    TG0 = 1
+    atg = 0.0001
+    rtol = 1e-9
+
+    for Pe in ([20000, 10000, 5000, 0], [2000, 1000, 500, 0], [200, 100, 50, 0]):
+        for A in (1, 5, 10):
+            z = np.linspace(min(left_boundaries), max(right_boundaries), 300)
+            T_fast = main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries)
+            with mpmath.workdps(40):
+                T_ref = main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries, precise=True)
+            error = np.max(np.abs(T_fast - T_ref) / np.maximum(np.abs(T_ref), 1))
+            status = 'OK' if error < rtol else 'FAIL'
+            print(f"Pe={Pe}, A={A}: max rel error {error:.2e} [{status}]")
+
+    # конечный zInf, малые A и отрицательные Pe: сверка TsGLin_numpy с TsGLin_mpmath на одном участке
+    z = np.linspace(0, 10, 200)
+    for zInf in (12, 100):
+        for A in (0.01, 1e-3, 0.1, 1):
+            for Pe in (0.5, 20, -0.5, -20):
+                T_fast = TsGLin_numpy(z, zInf, TG0, atg, A, Pe, 0, 2)
+                with mpmath.workdps(40):
+                    T_ref = np.array(TsGLin_mpmath(z, zInf, TG0, atg, A, Pe, 0, 2))
+                error = np.max(np.abs(T_fast - T_ref) / np.maximum(np.abs(T_ref), 1))
+                status = 'OK' if error < rtol else 'FAIL'
+                print(f"zInf={zInf}, A={A}, Pe={Pe}: max rel error {error:.2e} [{status}]")
+
+    # конечный zInf отличается от асимптотики не больше, чем TsGLin_asymptotic_error
+    Pe = [2000, 1000, 500, 0]
+    z = np.linspace(min(left_boundaries), max(right_boundaries), 300)
+    T_inf = main_func(z, TG0, atg, 5, Pe, left_boundaries, right_boundaries)
+    T_finite = main_func(z, TG0, atg, 5, Pe, left_boundaries, right_boundaries, zInf=100000)
+    print(f"zInf=1e5 vs zInf=inf: max abs difference {np.nanmax(np.abs(T_finite - T_inf)):.2e}")
+
+    # zInf = inf при Pe < 0 считается с конечной границей Z_INF_FINITE, в том числе в смешанном наборе Pe
+    z = np.linspace(0, 500, 200)
+    for A in (1e-3, 0.1):
+        Pe = np.array([[2000.0], [-1000.0], [0.0], [-20.0]])
+        T_fast = TsGLin_numpy(z, Z_INF, TG0, atg, A, Pe, 0, 2)
+        with mpmath.workdps(40):
+            T_ref = np.array([TsGLin_mpmath(z, Z_INF, TG0, atg, A, Pe_i, 0, 2) for Pe_i in Pe[:, 0]])
+        error = np.max(np.abs(T_fast - T_ref) / np.maximum(np.abs(T_ref), 1))
+        status = 'OK' if error < rtol else 'FAIL'
+        print(f"zInf=inf, A={A}, Pe={Pe[:, 0].tolist()}: max rel error {error:.2e} [{status}]")
+
+    # при малых A слагаемые числителя сокращаются, такие точки уходят в mpmath
+    z = np.linspace(min(left_boundaries), max(right_boundaries), 300)
+    _, slow_points = main_func_adaptive(z, TG0, atg, 1e-4, [20000, 10000, 5000, 0], left_boundaries, right_boundaries)
+    print(f"A=1e-4: {slow_points} points evaluated with mpmath")
+
+    # отрицательный Pe при малом A (zInf - zl) / |Pe|: precise='auto' считает участок в mpmath
+    z = np.linspace(0, 500, 200)
+    for zInf in (Z_INF, 12):
+        for A, Pe in ((1e-3, -1000), (0.1, -20000), (0.01, -20)):
+            z_segment = z[z <= min(zInf, z[-1])]
+            T_auto = TsGLin(z_segment, zInf, TG0, atg, A, Pe, 0, 2, precise='auto')
+            with mpmath.workdps(40):
+                T_ref = np.array(TsGLin_mpmath(z_segment, zInf, TG0, atg, A, Pe, 0, 2))
+            error = np.max(np.abs(T_auto - T_ref) / np.maximum(np.abs(T_ref), 1))
+            status = 'OK' if error < 1e-14 else 'FAIL'
+            print(f"auto, zInf={zInf}, A={A}, Pe={Pe}: max rel error {error:.2e} [{status}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from main_block.main_functions import main_func, main_func_batch
+
+# Общий на процесс LRU-кэш модельных кривых: ключ - хэш (z, границы, Pe, A, TG0, atg),
+# значения - массивы только для чтения, объем ограничен max_bytes
+class ForwardModelCache:
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(z, TG0, atg, A, Pe, left_boundaries, right_boundaries):
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (z, [TG0, atg, A], Pe, left_boundaries, right_boundaries):
+            values = np.ascontiguousarray(part, dtype=float)
+            digest.update(np.asarray(values.shape, dtype=np.int64).tobytes())
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def get_or_compute(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = np.array(compute(), dtype=float)
+        value.setflags(write=False)
+        if value.nbytes > self.max_bytes:
+            return value
+
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = value
+                self.nbytes += value.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return value
+
+    def info(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self.entries),
+                'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+forward_model_cache = ForwardModelCache()
+
+
+def cached_main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries):
+    key = ForwardModelCache.make_key(z, TG0, atg, A, Pe, left_boundaries, right_boundaries)
+    return forward_model_cache.get_or_compute(
+        key, lambda: main_func(z, TG0, atg, A, Pe, left_boundaries, right_boundaries))
+
+
+def cached_main_func_batch(z, TG0, atg, A, Pe_batch, left_boundaries, right_boundaries):
+    key = ForwardModelCache.make_key(z, TG0, atg, A, Pe_batch, left_boundaries, right_boundaries)
+    return forward_model_cache.get_or_compute(
+        key, lambda: main_func_batch(z, TG0, atg, A, Pe_batch, left_boundaries, right_boundaries))
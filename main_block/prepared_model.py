@@ -0,0 +1,60 @@
+import numpy as np
+from main_block.incremental_model import IncrementalTsGLin
+from main_block.main_functions import TsGLin_shifted, main_func_jacobian, restore_order, Z_INF
+
+# Модель с фиксированной геометрией (z, границы, A, TG0, atg): разбиение на участки,
+# смещения z - zl и длины интервалов считаются один раз, дальше меняется только Pe
+class PreparedModel(IncrementalTsGLin):
+    def __init__(self, z, TG0, atg, A, left_boundaries, right_boundaries):
+        super().__init__(z, TG0, atg, A, left_boundaries, right_boundaries)
+        self.x = np.asarray(z, dtype=float)
+
+        self.segments = []
+        for i, (start, stop, plateau_stop) in enumerate(self.segment_bounds):
+            zl = self.left_boundaries[i]
+            z_segment = self.z[start:stop]
+            self.segments.append({
+                'start': start,
+                'stop': stop,
+                'plateau_stop': plateau_stop,
+                'zl': zl,
+                'z': z_segment,
+                'u': z_segment - zl,
+                'a': Z_INF - zl,
+                'length': self.right_boundaries[i] - zl,
+            })
+
+    def update_segment(self, i, Pe_i):
+        segment = self.segments[i]
+        zl = segment['zl']
+        Tl = self.TsGLin_array[i]
+        self.TsGLin_array[i + 1] = TsGLin_shifted(self.right_boundaries[i], segment['length'], segment['a'],
+                                                  self.TG0, self.atg, self.A, Pe_i, zl, Tl)
+
+        self.result[segment['start']:segment['stop']] = TsGLin_shifted(segment['z'], segment['u'], segment['a'],
+                                                                       self.TG0, self.atg, self.A, Pe_i, zl, Tl)
+        self.result[segment['stop']:segment['plateau_stop']] = self.TsGLin_array[i + 1]
+        self.recomputed_segments += 1
+
+    def evaluate_batch(self, Pe_batch):
+        Pe_batch = np.atleast_2d(np.asarray(Pe_batch, dtype=float))
+        m = Pe_batch.shape[0]
+        TsGLin_array = np.zeros(m)
+        result = np.full((m, len(self.z)), np.nan)
+
+        for i, segment in enumerate(self.segments):
+            zl = segment['zl']
+            Pe_i = Pe_batch[:, i, None]
+            result[:, segment['start']:segment['stop']] = TsGLin_shifted(
+                segment['z'], segment['u'], segment['a'], self.TG0, self.atg, self.A, Pe_i, zl, TsGLin_array[:, None])
+            TsGLin_array = TsGLin_shifted(self.right_boundaries[i], segment['length'], segment['a'],
+                                          self.TG0, self.atg, self.A, Pe_batch[:, i], zl, TsGLin_array)
+            result[:, segment['stop']:segment['plateau_stop']] = TsGLin_array[:, None]
+
+        return restore_order(result, self.order)
+
+    def jacobian(self, Pe):
+        return main_func_jacobian(self.x, self.TG0, self.atg, self.A, Pe, self.left_boundaries, self.right_boundaries)
+
+    def residuals(self, Pe, y):
+        return self.evaluate(Pe) - y
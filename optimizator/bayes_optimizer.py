@@ -2,8 +2,9 @@ import optuna
 import numpy as np
 from lmfit import Parameters
 from main_block.main_functions import reconstruct_Pe_list, main_func
-from optimizator.optimizer import calculate_deviation_metric
-from optimizator.process import process_results
+from main_block.prepared_model import PreparedModel
+from optimizator.optimizer import history_dataframe
+from optimizator.process import HistoryRecorder
 
 def calculate_deltas_from_weights(weights, known_pe1):
     total = sum(weights)
@@ -19,7 +20,7 @@ def create_params_from_deltas(deltas):
 
 def objective_function(trial, x_data, y_data_noize, known_pe1,
                        found_left, found_right, true_left, true_right, Pe_true,
-                       TG0, atg, A, param_history):
+                       TG0, atg, A, recorder, model=None):
 
     n_layers = len(found_left) - 1
     weights = [trial.suggest_float(f"w_{i}", 0.01, 1.0) for i in range(n_layers)]
@@ -27,39 +28,49 @@ def objective_function(trial, x_data, y_data_noize, known_pe1,
     params = create_params_from_deltas(deltas)
 
     Pe_opt = reconstruct_Pe_list(params, known_pe1)
-    y_pred = main_func(x_data, TG0, atg, A, Pe_opt, found_left, found_right)
+    if model is not None:
+        y_pred = model.evaluate(Pe_opt)
+    else:
+        y_pred = main_func(x_data, TG0, atg, A, Pe_opt, found_left, found_right)
     residuals = y_pred - y_data_noize
     loss = float(np.sum(residuals ** 2))
 
-    deviation_metric = calculate_deviation_metric(x_data, found_left, found_right, true_left, true_right, Pe_true, Pe_opt)
-
-    param_values = {f"w_{i}": w for i, w in enumerate(weights)}
-    param_values["Pe"] = Pe_opt
-    param_values["residuals"] = loss
-
-    param_history.append((param_values, deviation_metric, trial.number))
+    if recorder.wants(trial.number):
+        recorder.record(trial.number, weights, Pe_opt, loss)
 
     return loss
 
 
 def run_bayes_optimization(x_data, y_data_noize, found_left, found_right,
-                           true_left, true_right, Pe, TG0, atg, A, n_trials=200):
+                           true_left, true_right, Pe, TG0, atg, A, n_trials=200, history='full'):
+    model = PreparedModel(x_data, TG0, atg, A, found_left, found_right)
+    return run_prepared_bayes_optimization(model, y_data_noize, true_left, true_right, Pe, n_trials, history)
+
+
+def run_prepared_bayes_optimization(model, y_data_noize, true_left, true_right, Pe, n_trials=200, history='full'):
+    x_data, found_left, found_right = model.x, model.left_boundaries, model.right_boundaries
     known_pe1 = Pe[0]
-    param_history = []
+    n_layers = len(found_left) - 1
+    recorder = HistoryRecorder([f"w_{i}" for i in range(n_layers)], len(found_left), history)
 
     def wrapped_objective(trial):
         return objective_function(trial, x_data, y_data_noize, known_pe1,
                                   found_left, found_right, true_left, true_right, Pe,
-                                  TG0, atg, A, param_history)
+                                  model.TG0, model.atg, model.A, recorder, model)
 
     study = optuna.create_study(direction='minimize')
     study.optimize(wrapped_objective, n_trials=n_trials)
 
-    n_layers = len(found_left) - 1
+    last = study.trials[-1]
+    last_weights = [last.params[f"w_{i}"] for i in range(n_layers)]
+    last_Pe = reconstruct_Pe_list(create_params_from_deltas(calculate_deltas_from_weights(last_weights, known_pe1)),
+                                  known_pe1)
+    recorder.finish(last.number, last_weights, last_Pe, last.value)
+
     best_weights = [study.best_params[f"w_{i}"] for i in range(n_layers)]
     deltas = calculate_deltas_from_weights(best_weights, known_pe1)
     best_params = create_params_from_deltas(deltas)
 
     Pe_opt = reconstruct_Pe_list(best_params, known_pe1)
-    df_history = process_results(param_history)
-    return Pe_opt, df_history
\ No newline at end of file
+    df_history = history_dataframe(recorder, x_data, found_left, found_right, true_left, true_right, Pe)
+    return Pe_opt, df_history
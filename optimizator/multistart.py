@@ -0,0 +1,98 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scipy.stats import qmc
+from main_block.data import noise_level
+from main_block.prepared_model import PreparedModel
+from optimizator.optimizer import run_prepared_optimization, calculate_deviation_metric
+
+# Стартовые точки из латинского гиперкуба на симплексе весов: u ~ LHS в [0, 1]^n, веса -ln(u) / сумма
+# (равномерно на симплексе, как веса в bayes_optimizer), delta = вес * Pe_1; свободны первые n - 1 delta.
+# Нулевой старт - обычная начальная точка метода (None), поэтому мультистарт не хуже одиночного запуска
+def simplex_starts(n_starts, n_deltas, known_pe1, seed=None):
+    u = qmc.LatinHypercube(d=n_deltas, seed=seed).random(max(n_starts - 1, 0))
+    weights = -np.log(np.clip(u, 1e-12, 1.0))
+    weights /= weights.sum(axis=1, keepdims=True)
+    return [None] + list(weights[:, :-1] * known_pe1)
+
+
+def run_start(model, y_data, true_left, true_right, Pe, method, initial_deltas, history):
+    start_time = time.perf_counter()
+    Pe_opt, df_history = run_prepared_optimization(model, y_data, true_left, true_right, Pe, method, history,
+                                                   initial_deltas)
+    residual = float(np.nansum(model.residuals(Pe_opt, y_data) ** 2))
+    return Pe_opt, df_history, residual, time.perf_counter() - start_time
+
+
+def run_multistart(x_data, y_data, found_left, found_right, true_left, true_right, Pe, TG0, atg, A, method='leastsq',
+                   n_starts=8, n_jobs=None, sigma=None, tolerance=1.05, seed=None, history='full'):
+    model = PreparedModel(x_data, TG0, atg, A, found_left, found_right)
+    return run_prepared_multistart(model, y_data, true_left, true_right, Pe, method, n_starts, n_jobs, sigma,
+                                   tolerance, seed, history)
+
+
+# Несколько локальных подборов из разных стартов в пуле процессов (n_jobs = 1 - последовательно).
+# Как только один из стартов достигает уровня шума (сумма квадратов невязок <= tolerance * N * sigma^2),
+# еще не начатые старты отменяются; sigma по умолчанию оценивается по вторым разностям данных.
+# Возвращает Pe и историю лучшего старта и таблицу по всем стартам
+def run_prepared_multistart(model, y_data, true_left, true_right, Pe, method='leastsq', n_starts=8, n_jobs=None,
+                            sigma=None, tolerance=1.05, seed=None, history='full'):
+    y_data = np.asarray(y_data, dtype=float)
+    found_left = model.left_boundaries
+    fitted = (model.x >= found_left[0]) & np.isfinite(y_data)
+    if sigma is None:
+        sigma = noise_level(y_data[fitted])
+    noise_floor = tolerance * np.count_nonzero(fitted) * sigma ** 2
+    starts = simplex_starts(n_starts, len(found_left) - 1, Pe[0], seed)
+
+    results = {}
+    if n_jobs == 1:
+        for i, initial_deltas in enumerate(starts):
+            results[i] = run_start(model, y_data, true_left, true_right, Pe, method, initial_deltas, history)
+            if results[i][2] <= noise_floor:
+                break
+    else:
+        # в работе не больше n_jobs стартов: новый отправляется, когда завершился предыдущий, поэтому
+        # после выхода на уровень шума не начинается ни один лишний; запущенные дорабатывают и попадают в таблицу
+        n_workers = n_jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            pending = {}
+            next_start = 0
+            reached = False
+            while next_start < len(starts) or pending:
+                while not reached and next_start < len(starts) and len(pending) < n_workers:
+                    future = executor.submit(run_start, model, y_data, true_left, true_right, Pe, method,
+                                             starts[next_start], history)
+                    pending[future] = next_start
+                    next_start += 1
+                if not pending:
+                    break
+                future = next(as_completed(pending))
+                i = pending.pop(future)
+                results[i] = future.result()
+                reached = reached or results[i][2] <= noise_floor
+
+    rows = []
+    for i, initial_deltas in enumerate(starts):
+        row = {'start': i, 'initial_deltas': None if initial_deltas is None else initial_deltas.tolist(),
+               'status': 'cancelled'}
+        if i in results:
+            Pe_opt, _, residual, elapsed = results[i]
+            row.update({
+                'status': 'done',
+                'residuals': residual,
+                'Невязка': calculate_deviation_metric(model.x, found_left, model.right_boundaries,
+                                                      true_left, true_right, Pe, Pe_opt),
+                'time': elapsed,
+                'Pe': Pe_opt,
+                'reached_noise_floor': residual <= noise_floor,
+            })
+        rows.append(row)
+    df_starts = pd.DataFrame(rows)
+
+    best = min(results, key=lambda i: results[i][2])
+    Pe_best, df_history = results[best][0], results[best][1]
+    df_starts['best'] = df_starts['start'] == best
+    return Pe_best, df_history, df_starts
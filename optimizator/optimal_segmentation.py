@@ -0,0 +1,263 @@
+import numpy as np
+from scipy.optimize import least_squares
+from main_block.data import noise_level
+from main_block.main_functions import TsGLin_shifted, main_func, Z_INF
+
+# Совместный поиск границ и Pe динамическим программированием по модели main_func.
+# Профиль - чередование интервалов [L_i, R_i) с кривой TsGLin и плато [R_i, L_{i+1}) с постоянным
+# значением TsGLin(R_i); стоимость - сумма квадратов невязок + penalty за каждый интервал.
+# Как в main_func, первый интервал начинается с первой точки профиля (точки с nan до L_0 отбрасываются)
+# с температурой на входе TsGLin_init = 0, а после последнего интервала может идти плато до конца профиля.
+# Состояния на кандидатных позициях p: F_I[p] - интервал заканчивается в p, F_P[p] - плато
+# заканчивается в p; температура на входе следующего интервала переносится вместе с лучшим
+# предшественником, как TsGLin_array в main_func. Правая граница R интервала, последняя точка которого
+# z[e - 1], лежит в (z[e - 1], z[e]], поэтому значение на плато TsGLin(R) ограничено отрезком
+# [TsGLin(z[e - 1]), TsGLin(z[e])]: берется среднее по плато, прижатое к этому отрезку, а R восстанавливается
+# по нему линейной интерполяцией. Pe интервала подбирается по сетке Pe_grid, затем Pe и границы уточняются
+# совместным МНК-подбором по main_func (refine_segmentation): на сетке кандидатов границы и Pe дискретны,
+# и при малом шуме DP дробит интервалы, компенсируя эту дискретность, поэтому после подбора лишние
+# интервалы сливаются с соседними или заменяются плато, пока это уменьшает сумму квадратов невязок + penalty.
+# Отсечение: upper_bound - стоимость лучшего полного решения на текущий момент (оставшийся профиль
+# закрывается плато); стоимость интервала не убывает с его длиной, поэтому строка интервала,
+# начинающегося в p, досчитывается только пока F_P[p] + стоимость + penalty < upper_bound
+def plateau_cost(S1, S2, start, stop, level):
+    n = stop - start
+    return (S2[stop] - S2[start]) - 2 * level * (S1[stop] - S1[start]) + n * level ** 2
+
+
+def refine_grid_minimum(Pe_grid, table):
+    # Минимум по сетке в каждом столбце table (узлы Pe x правые границы) уточняется параболой
+    # через три соседних узла (по log Pe, у узла Pe = 0 - по Pe)
+    G = len(Pe_grid)
+    columns = np.arange(table.shape[1])
+    g = np.argmin(table, axis=0)
+    best = table[g, columns]
+    inner = np.clip(g, 1, G - 2)
+    x_grid = np.log(np.where(Pe_grid > 0, Pe_grid, 1.0))
+    use_log = Pe_grid[inner - 1] > 0
+    x = np.where(use_log, np.stack([x_grid[inner - 1], x_grid[inner], x_grid[inner + 1]]),
+                 np.stack([Pe_grid[inner - 1], Pe_grid[inner], Pe_grid[inner + 1]]))
+    c0, c1, c2 = table[inner - 1, columns], table[inner, columns], table[inner + 1, columns]
+    h0, h1 = x[1] - x[0], x[2] - x[1]
+    curvature = (c2 - c1) / h1 - (c1 - c0) / h0
+    valid = (g == inner) & (curvature > 0)
+
+    # вершина параболы через узлы (x0, c0), (x1, c1), (x2, c2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = curvature / (h0 + h1)
+        b = (c1 - c0) / h0 - a * (x[0] + x[1])
+        x_min = np.clip(-b / (2 * a), x[0], x[2])
+        cost = np.maximum(c1 + (x_min - x[1]) * ((c1 - c0) / h0 + a * (x_min - x[0])), 0.0)
+    Pe = np.where(use_log, np.exp(np.where(valid, x_min, 0.0)), x_min)
+    return np.where(valid, np.minimum(cost, best), best), np.where(valid, Pe, Pe_grid[g])
+
+
+def interval_cost_row(z, y, candidates, k, Tl, TG0, atg, A, Pe_grid, F_start, penalty, upper_bound, chunk_size):
+    # Стоимости интервалов [candidates[k], candidates[j]) для всех j > k по сетке Pe, лучший Pe и значения
+    # TsGLin в последней точке интервала и в первой точке после него (границы отрезка значений на плато)
+    M = len(candidates)
+    n = len(z)
+    p = candidates[k]
+    zl = z[p]
+    costs = np.full(M, np.inf)
+    best_Pe = np.zeros(M)
+    levels = np.zeros((2, M))
+    Pe_column = Pe_grid[:, None]
+
+    running = np.zeros(len(Pe_grid))
+    j = k + 1
+    for chunk_start in range(p, n, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, n)
+        z_chunk = z[chunk_start:chunk_stop]
+        model = TsGLin_shifted(z_chunk, z_chunk - zl, Z_INF - zl, TG0, atg, A, Pe_column, zl, Tl)
+        cumulative = running[:, None] + np.cumsum((model - y[chunk_start:chunk_stop]) ** 2, axis=1)
+
+        j_stop = np.searchsorted(candidates, chunk_stop, side='right')
+        if j_stop > j:
+            ends = candidates[j:j_stop]
+            costs[j:j_stop], best_Pe[j:j_stop] = refine_grid_minimum(Pe_grid, cumulative[:, ends - chunk_start - 1])
+            z_right = z[np.stack((ends - 1, np.minimum(ends, n - 1)))]
+            levels[:, j:j_stop] = TsGLin_shifted(z_right, z_right - zl, Z_INF - zl, TG0, atg, A, best_Pe[j:j_stop],
+                                                 zl, Tl)
+            j = j_stop
+
+        running = cumulative[:, -1]
+        if F_start + running.min() + penalty >= upper_bound:
+            break
+
+    return costs, best_Pe, levels
+
+
+def right_boundary(z, e, bounds, level):
+    # R в (z[e - 1], z[e]], при котором TsGLin(R) = level, линейной интерполяцией между значениями bounds
+    if e >= len(z):
+        return z[-1]
+    t = 1.0 if bounds[1] == bounds[0] else np.clip((level - bounds[0]) / (bounds[1] - bounds[0]), 0.0, 1.0)
+    return z[e - 1] + t * (z[e] - z[e - 1])
+
+
+# Совместный МНК-подбор Pe и границ по main_func. Границы задаются неотрицательными приращениями
+# z[0] - L_0, R_0 - L_0, L_1 - R_0, ..., чтобы сохранялся порядок L_0 <= z[0], L_0 <= R_0 <= L_1 <= ...
+# (L_0 не правее первой точки: выше нее в модели nan)
+def segmentation_boundaries(z, gaps):
+    boundaries = np.minimum(z[0] - gaps[0] + np.concatenate(([0.0], np.cumsum(gaps[1:]))), z[-1])
+    return boundaries[0::2], boundaries[1::2]
+
+
+def fit_segmentation(z, y, TG0, atg, A, left_boundaries, right_boundaries, Pe):
+    k = len(Pe)
+    boundaries = np.column_stack((left_boundaries, right_boundaries)).ravel()
+    gaps = np.concatenate(([max(z[0] - boundaries[0], 0.0)], np.maximum(np.diff(boundaries), 0.0)))
+    step = np.median(np.diff(z))
+
+    def residuals(params):
+        return main_func(z, TG0, atg, A, params[:k], *segmentation_boundaries(z, params[k:])) - y
+
+    # невязка нужна с точностью до малой доли penalty, а не до машинной точности
+    result = least_squares(residuals, np.concatenate((Pe, gaps)), bounds=(0, np.inf),
+                           x_scale=np.concatenate((np.maximum(Pe, 10.0), np.maximum(gaps, step))),
+                           ftol=1e-6, xtol=1e-6)
+    left_boundaries, right_boundaries = segmentation_boundaries(z, result.x[k:])
+    return list(left_boundaries), list(right_boundaries), result.x[:k], 2 * float(result.cost)
+
+
+def refine_segmentation(z, y, TG0, atg, A, left_boundaries, right_boundaries, Pe, penalty):
+    left_boundaries, right_boundaries, Pe, sse = fit_segmentation(z, y, TG0, atg, A, left_boundaries,
+                                                                  right_boundaries, Pe)
+    # интервал i заменяется плато (при очень больших Pe интервал от плато не отличается) или сливается
+    # с интервалом i + 1 вместе с плато между ними; изменение принимается, если после подбора
+    # сумма квадратов невязок выросла меньше чем на penalty
+    i = 0
+    while i < len(Pe) and len(Pe) > 1:
+        trials = []
+        if i > 0:
+            trials.append((left_boundaries[:i] + left_boundaries[i + 1:],
+                           right_boundaries[:i] + right_boundaries[i + 1:], np.delete(Pe, i)))
+        if i < len(Pe) - 1:
+            trials.append((left_boundaries[:i + 1] + left_boundaries[i + 2:],
+                           right_boundaries[:i] + right_boundaries[i + 1:],
+                           np.concatenate((Pe[:i], [(Pe[i] + Pe[i + 1]) / 2], Pe[i + 2:]))))
+        for trial in trials:
+            trial = fit_segmentation(z, y, TG0, atg, A, *trial)
+            if trial[3] < sse + penalty:
+                left_boundaries, right_boundaries, Pe, sse = trial
+                break
+        else:
+            i += 1
+    return left_boundaries, right_boundaries, Pe
+
+
+def optimal_segmentation(x_data, y_data, TG0, atg, A, penalty=None, beta=2.0, max_candidates=400, Pe_grid=None,
+                         chunk_size=512, refine=True, n_kinks=20):
+    z = np.asarray(x_data, dtype=float)
+    y = np.asarray(y_data, dtype=float)
+    order = np.argsort(z, kind='stable')
+    z, y = z[order], y[order]
+    finite = np.isfinite(y)
+    z, y = z[finite], y[finite]
+    n = len(z)
+
+    if Pe_grid is None:
+        Pe_grid = np.concatenate(([0.0], np.geomspace(10, 1e5, 255)))
+    Pe_grid = np.asarray(Pe_grid, dtype=float)
+    if penalty is None:
+        penalty = 3 * 2 * beta * noise_level(y) ** 2 * np.log(n)
+
+    stride = int(np.ceil(n / max_candidates))
+    kinks = np.argsort(np.abs(np.diff(y, 2)))[-n_kinks:] + 1
+    candidates = np.unique(np.concatenate((np.arange(0, n, stride), kinks, [n])))
+    M = len(candidates)
+    S1 = np.concatenate(([0.0], np.cumsum(y)))
+    S2 = np.concatenate(([0.0], np.cumsum(y * y)))
+
+    F_I = np.full(M, np.inf)
+    F_P = np.full(M, np.inf)
+    level_I = np.zeros((2, M))
+    level_P = np.zeros(M)
+    from_I = np.full(M, -1)
+    from_P = np.full(M, -1)
+    Pe_I = np.zeros(M)
+    costs = np.full((M, M), np.inf)
+    best_Pe = np.zeros((M, M))
+    levels = np.zeros((M, 2, M))
+
+    # пустое плато перед первым интервалом: вход первого интервала TsGLin_init = 0 (level_P[0])
+    F_P[0] = 0.0
+    upper_bound = np.inf
+    for k in range(M):
+        p = candidates[k]
+        if k > 0:
+            values = F_P[:k] + costs[:k, k]
+            j = int(np.argmin(values))
+            F_I[k] = values[j] + penalty
+            from_I[k], Pe_I[k], level_I[:, k] = j, best_Pe[j, k], levels[j, :, k]
+
+            # плато [candidates[b], p) после интервала, закончившегося в b, держит значение TsGLin(R_b);
+            # b = k - плато нулевой длины, следующий интервал начинается сразу с R_b = z[p]
+            starts = candidates[:k + 1]
+            plateau_level = np.clip((S1[p] - S1[starts]) / np.maximum(p - starts, 1),
+                                    level_I[:, :k + 1].min(axis=0), level_I[:, :k + 1].max(axis=0))
+            plateau_level[k] = level_I[1, k]
+            values = F_I[:k + 1] + plateau_cost(S1, S2, starts, p, plateau_level)
+            b = int(np.argmin(values))
+            F_P[k] = values[b]
+            from_P[k], level_P[k] = b, plateau_level[b]
+
+            # продолжение текущего плато или плато после интервала до конца профиля - допустимое решение
+            tail_level = np.clip((S1[n] - S1[p]) / max(n - p, 1), level_I[:, k].min(), level_I[:, k].max())
+            upper_bound = min(upper_bound,
+                              F_P[k] + plateau_cost(S1, S2, p, n, level_P[k]),
+                              F_I[k] + plateau_cost(S1, S2, p, n, tail_level))
+
+        if k < M - 1 and F_P[k] + penalty < upper_bound:
+            costs[k], best_Pe[k], levels[k] = interval_cost_row(
+                z, y, candidates, k, level_P[k], TG0, atg, A, Pe_grid, F_P[k], penalty, upper_bound, chunk_size)
+
+    # восстановление решения с конца: последний интервал доходит до конца профиля или за ним идет плато
+    left_boundaries, right_boundaries, Pe = [], [], []
+    state, k = ('I' if F_I[M - 1] <= F_P[M - 1] else 'P'), M - 1
+    level = level_P[M - 1]
+    while not (state == 'P' and k == 0):
+        if state == 'P':
+            level = level_P[k]
+            state, k = 'I', from_P[k]
+        else:
+            j = from_I[k]
+            left_boundaries.append(z[candidates[j]])
+            right_boundaries.append(right_boundary(z, candidates[k], level_I[:, k], level))
+            Pe.append(Pe_I[k])
+            state, k = 'P', j
+
+    left_boundaries, right_boundaries, Pe = left_boundaries[::-1], right_boundaries[::-1], np.array(Pe[::-1])
+    if refine and len(Pe):
+        left_boundaries, right_boundaries, Pe = refine_segmentation(z, y, TG0, atg, A, left_boundaries,
+                                                                    right_boundaries, Pe, penalty)
+
+    return left_boundaries, right_boundaries, Pe.tolist()
+
+
+# тестовый пример: число интервалов и Pe на синтетическом профиле, в том числе с данными выше первой границы
+def main():
+    from main_block.data import noize_data
+    left_boundaries = [50, 150, 300, 450]
+    right_boundaries = [100, 250, 350, 520]
+    Pe = [2000, 1200, 500, 0]
+    TG0 = 1
+    atg = 0.0001
+    sigma = 1e-4
+
+    np.random.seed(0)
+    for A in (2, 5):
+        for N, z_min in ((300, 50), (1000, 50), (1000, 0)):
+            x_data = np.linspace(z_min, max(right_boundaries), N)
+            y_data = noize_data(main_func(x_data, TG0, atg, A, Pe, left_boundaries, right_boundaries), sigma)
+            found_left, found_right, Pe_found = optimal_segmentation(x_data, y_data, TG0, atg, A)
+            Pe_error = max(abs(p_found - p) / max(p, 100) for p_found, p in zip(Pe_found, Pe)) \
+                if len(Pe_found) == len(Pe) else np.inf
+            status = 'OK' if len(Pe_found) == len(Pe) and Pe_error < 0.1 else 'FAIL'
+            print(f"A={A}, N={N}, z from {z_min}: {len(Pe_found)} intervals, "
+                  f"Pe={np.round(Pe_found).tolist()}, max Pe error {Pe_error:.3f} [{status}]")
+
+
+if __name__ == "__main__":
+    main()
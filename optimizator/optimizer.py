@@ -1,8 +1,9 @@
 import numpy as np
-from scipy.integrate import simpson
+from scipy.optimize import least_squares
 from lmfit import minimize, Parameters
-from main_block.main_functions import main_func, reconstruct_Pe_list
-from optimizator.process import process_results
+from main_block.main_functions import main_func, main_func_jacobian, reconstruct_Pe_list
+from main_block.prepared_model import PreparedModel
+from optimizator.process import HistoryRecorder
 
 def create_parameters(boundary, known_pe1):
     params = Parameters()
@@ -17,61 +18,215 @@ def create_parameters(boundary, known_pe1):
     return params
 
 
-def calculate_deviation_metric(z, found_left, found_right, true_left, true_right, Pe_true, Pe_opt):
-    step_opt = compute_leakage_profile(z, found_left, found_right, Pe_opt)
-    step_true = compute_leakage_profile(z, true_left, true_right, Pe_true)
+# Профиль утечек - ступенчатая функция: на плато [R_i, L_{i+1}) значение Pe_i - Pe_{i+1}, вне плато ноль.
+# Возвращает индексы плато, на которые попадают точки (-1 - вне плато); пустые плато пропускаются
+def leakage_step_index(points, left_boundary, right_boundary):
+    points = np.asarray(points, dtype=float)
+    starts = np.asarray(right_boundary[:-1], dtype=float)
+    ends = np.asarray(left_boundary[1:], dtype=float)
+    plateaus = np.flatnonzero(ends > starts)
+    plateaus = plateaus[np.argsort(starts[plateaus], kind='stable')]
+
+    index = np.full(points.shape, -1)
+    if plateaus.size == 0:
+        return index
+    position = np.searchsorted(starts[plateaus], points, side='right') - 1
+    candidate = plateaus[np.maximum(position, 0)]
+    inside = (position >= 0) & (points < ends[candidate])
+    index[inside] = candidate[inside]
+    return index
+
+
+def leakage_step_values(index, Pe_list):
+    # Pe_list - вектор или матрица (строки - наборы Pe); значения ступеней в точках с индексами плато index
+    Pe_list = np.asarray(Pe_list, dtype=float)
+    steps = np.append(Pe_list[..., :-1] - Pe_list[..., 1:], np.zeros(Pe_list.shape[:-1] + (1,)), axis=-1)
+    return steps[..., index]
+
+
+# Относительная L1-ошибка профиля утечек (%) на [min z, max z] точно: обе функции ступенчатые,
+# интеграл - сумма по отрезкам между объединенными точками разрыва, O(k log k) вместо O(N).
+# Pe_opt может быть матрицей - тогда метрика считается для каждой строки
+def deviation_metric_batch(z, found_left, found_right, true_left, true_right, Pe_true, Pe_opt):
+    z_min, z_max = float(np.min(z)), float(np.max(z))
+    breaks = np.concatenate(([z_min, z_max], found_right[:-1], found_left[1:], true_right[:-1], true_left[1:]))
+    breaks = np.unique(np.clip(np.asarray(breaks, dtype=float), z_min, z_max))
+    widths = np.diff(breaks)
+    middles = breaks[:-1] + widths / 2
+
+    step_true = leakage_step_values(leakage_step_index(middles, true_left, true_right), Pe_true)
+    step_opt = leakage_step_values(leakage_step_index(middles, found_left, found_right), Pe_opt)
+    l1_diff = np.abs(step_opt - step_true) @ widths
+    l1_true = np.abs(step_true) @ widths
+    return l1_diff / l1_true * 100
 
-    diff_abs = np.abs(step_opt - step_true)
-    true_abs = np.abs(step_true)
-    l1_diff = simpson(diff_abs, x=z)
-    l1_true = simpson(true_abs, x=z)
-    relative_l1_error_percent = (l1_diff / l1_true) * 100
 
-    return relative_l1_error_percent
+def calculate_deviation_metric(z, found_left, found_right, true_left, true_right, Pe_true, Pe_opt):
+    return float(deviation_metric_batch(z, found_left, found_right, true_left, true_right, Pe_true, Pe_opt))
 
 
-def optimization_residuals(params, x, y, TG0, atg, A, Pe, left_boundaries, right_boundaries):
+def optimization_residuals(params, x, y, TG0, atg, A, Pe, left_boundaries, right_boundaries, model=None):
     Pe = reconstruct_Pe_list(params, Pe[0])
+    if model is not None:
+        return model.evaluate(Pe) - y
     return main_func(x, TG0, atg, A, Pe, left_boundaries, right_boundaries) - y
 
 
+# Аналитический якобиан невязки по свободным delta_0 ... delta_{n-2}:
+# Pe_j = Pe_1 - (delta_0 + ... + delta_{j-1}), последний Pe фиксирован ограничением на сумму delta
+def optimization_jacobian(params, x, y, TG0, atg, A, Pe, left_boundaries, right_boundaries, model=None):
+    Pe = reconstruct_Pe_list(params, Pe[0])
+    if model is not None:
+        jacobian_Pe = model.jacobian(Pe)
+    else:
+        jacobian_Pe = main_func_jacobian(x, TG0, atg, A, Pe, left_boundaries, right_boundaries)
+    jacobian = -np.cumsum(jacobian_Pe[:, -2:0:-1], axis=1)[:, ::-1]
+
+    # строки должны совпадать с невязкой после nan_policy='omit'
+    mask = np.all(np.isfinite(jacobian), axis=1) & np.isfinite(y)
+    return jacobian[mask]
+
+
 def compute_leakage_profile(z, left_boundary, right_boundary, Pe_list):
-    z = np.array(z)
-    result = np.zeros_like(z)
-    for i in range(len(right_boundary) - 1):
-        mask = (z >= right_boundary[i]) & (z < left_boundary[i + 1])
-        result[mask] = Pe_list[i] - Pe_list[i + 1]
-    return result
+    z = np.asarray(z, dtype=float)
+    return leakage_step_values(leakage_step_index(z, left_boundary, right_boundary), Pe_list)
+
 
+def history_names(params):
+    return [param.name for param in params.values() if param.vary or 'delta' in param.name]
 
-def optimization_callback(params, iter, resid, param_history, z, found_left, found_right, true_left, true_right, Pe_true):
-    param_values = {param.name: float(param.value) for param in params.values() if param.vary or 'delta' in param.name}
-    Pe_current = reconstruct_Pe_list(params, Pe_true[0])
-    deviation_metric = calculate_deviation_metric(z, found_left, found_right, true_left, true_right, Pe_true, Pe_current)
 
-    param_values['Pe'] = Pe_current
-    param_values['residuals'] = float(np.sum(resid**2))
+def optimization_callback(params, iter, resid, recorder, names, Pe_true):
+    if not recorder.wants(iter):
+        return
+    recorder.record(iter, [params[name].value for name in names], reconstruct_Pe_list(params, Pe_true[0]),
+                    float(np.sum(resid**2)))
 
-    param_history.append((param_values, deviation_metric, iter))
 
+# Метрика отклонения для истории считается после подбора, сразу для всех сохраненных итераций
+def history_dataframe(recorder, x_data, found_left, found_right, true_left, true_right, Pe_true):
+    return recorder.to_dataframe(lambda Pe_rows: deviation_metric_batch(
+        x_data, found_left, found_right, true_left, true_right, Pe_true, Pe_rows))
 
-def run_optimization(x_data, y_data, found_left, found_right, true_left, true_right, Pe, TG0, atg, A, method = 'leastsq'):
+
+# history: 'full' - каждая итерация, целое k - каждая k-я и последняя, 'off' - без истории (пустая таблица);
+# initial_deltas - стартовые значения свободных delta_0 ... delta_{n-2} (по умолчанию как раньше)
+def run_optimization(x_data, y_data, found_left, found_right, true_left, true_right, Pe, TG0, atg, A, method = 'leastsq',
+                     history='full', initial_deltas=None):
+    model = PreparedModel(x_data, TG0, atg, A, found_left, found_right)
+    return run_prepared_optimization(model, y_data, true_left, true_right, Pe, method, history, initial_deltas)
+
+
+def run_prepared_optimization(model, y_data, true_left, true_right, Pe, method='leastsq', history='full',
+                              initial_deltas=None):
+    if method in LEAN_METHODS:
+        return run_prepared_least_squares(model, y_data, true_left, true_right, Pe, method=LEAN_METHODS[method],
+                                          history=history, initial_deltas=initial_deltas)
+    x_data, found_left, found_right = model.x, model.left_boundaries, model.right_boundaries
     known_pe1 = Pe[0]
     params = create_parameters(found_left, known_pe1)
-    param_history = []
+    names = history_names(params)
+    recorder = HistoryRecorder(names, len(found_left), history)
+
+    fit_kws = {}
+    if method in ('leastsq', 'least_squares'):
+        # на границе min=0 преобразование lmfit обнуляет аналитический градиент, стартуем из центра симплекса
+        for param in params.values():
+            if param.vary:
+                param.value = known_pe1 / (len(found_left) - 1)
+        fit_kws['Dfun'] = lambda params, x, y: optimization_jacobian(params, x, y, model.TG0, model.atg, model.A, Pe,
+                                                                     found_left, found_right, model)
+    if initial_deltas is not None:
+        free = [param for param in params.values() if param.vary]
+        for param, value in zip(free, initial_deltas):
+            param.value = float(value)
 
     result = minimize(
-        lambda params, x, y: optimization_residuals(params, x, y, TG0, atg, A, Pe, found_left, found_right),
+        lambda params, x, y: optimization_residuals(params, x, y, model.TG0, model.atg, model.A, Pe,
+                                                    found_left, found_right, model),
         params,
         args=(x_data, y_data),
         method=method,
-        iter_cb=lambda params, iter, resid, *args, **kwargs: optimization_callback(
-            params, iter, resid, param_history, x_data, found_left, found_right, true_left, true_right, Pe),
+        iter_cb=(lambda params, iter, resid, *args, **kwargs: optimization_callback(
+            params, iter, resid, recorder, names, Pe)) if recorder.enabled else None,
         nan_policy='omit',
         # epsfcn = 1e-8
         # ftol = 1e-2
+        **fit_kws
     )
     Pe_opt = reconstruct_Pe_list(result.params, Pe[0])
+    recorder.finish(result.nfev, [result.params[name].value for name in names], Pe_opt, float(result.chisqr))
+
+    df_history = history_dataframe(recorder, x_data, found_left, found_right, true_left, true_right, Pe)
+    return Pe_opt, df_history
+
+
+# Методы, которые считаются напрямую в scipy.optimize.least_squares без Parameters lmfit
+LEAN_METHODS = {'scipy_trf': 'trf', 'scipy_dogbox': 'dogbox'}
+
+
+# Pe по свободным delta_0 ... delta_{n-2}: Pe_{j+1} = Pe_j - delta_j, последний Pe = Pe_1 - сумма всех delta = 0,
+# как у create_parameters с ограничением expr на последнюю delta
+def deltas_to_Pe(deltas, known_pe1):
+    return np.concatenate(([known_pe1], known_pe1 - np.cumsum(deltas), [0.0]))
+
+
+# Разреженность якобиана для конечных разностей: delta_k влияет только на точки с z >= left_{k+1}
+def deltas_jacobian_sparsity(x, left_boundaries, mask):
+    starts = np.asarray(left_boundaries[1:-1], dtype=float)
+    return (x[mask, None] >= starts[None, :]).astype(int)
+
+
+def run_least_squares(x_data, y_data, found_left, found_right, true_left, true_right, Pe, TG0, atg, A,
+                      method='trf', jac='analytic', history='full', initial_deltas=None):
+    model = PreparedModel(x_data, TG0, atg, A, found_left, found_right)
+    return run_prepared_least_squares(model, y_data, true_left, true_right, Pe, method, jac, history, initial_deltas)
+
+
+def run_prepared_least_squares(model, y_data, true_left, true_right, Pe, method='trf', jac='analytic', history='full',
+                               initial_deltas=None):
+    # jac: 'analytic' - якобиан PreparedModel, '2-point'/'3-point' - конечные разности с jac_sparsity
+    x_data, found_left, found_right = model.x, model.left_boundaries, model.right_boundaries
+    y_data = np.asarray(y_data, dtype=float)
+    known_pe1 = float(Pe[0])
+    n_layers = len(found_left)
+    n_free = n_layers - 2
+    recorder = HistoryRecorder([f"delta_{i}" for i in range(n_layers - 1)], n_layers, history)
+    nfev = [0]
+
+    # точки выше первой границы (nan в модели) исключаются, как nan_policy='omit'
+    mask = np.isfinite(model.evaluate(deltas_to_Pe(np.zeros(n_free), known_pe1))) & np.isfinite(y_data)
+    y_masked = y_data[mask]
+
+    def residuals(deltas):
+        Pe_current = deltas_to_Pe(deltas, known_pe1)
+        resid = model.evaluate(Pe_current)[mask] - y_masked
+        nfev[0] += 1
+        if recorder.wants(nfev[0]):
+            recorder.record(nfev[0], np.append(deltas, Pe_current[-2]), Pe_current, float(np.sum(resid ** 2)))
+        return resid
+
+    def jacobian(deltas):
+        jacobian_Pe = model.jacobian(deltas_to_Pe(deltas, known_pe1))[mask]
+        return -np.cumsum(jacobian_Pe[:, -2:0:-1], axis=1)[:, ::-1]
+
+    if n_free == 0:
+        residuals(np.zeros(0))
+        Pe_opt = deltas_to_Pe(np.zeros(0), known_pe1).tolist()
+        return Pe_opt, history_dataframe(recorder, x_data, found_left, found_right, true_left, true_right, Pe)
+
+    jac_kws = {'jac': jacobian}
+    if jac != 'analytic':
+        jac_kws = {'jac': jac, 'jac_sparsity': deltas_jacobian_sparsity(x_data, found_left, mask)}
+
+    # старт из центра симплекса, масштаб delta - средняя ступень Pe
+    x0 = np.full(n_free, known_pe1 / (n_layers - 1))
+    if initial_deltas is not None:
+        x0 = np.clip(np.asarray(initial_deltas, dtype=float), 0, known_pe1)
+    result = least_squares(residuals, x0, bounds=(0, known_pe1), method=method,
+                           x_scale=np.full(n_free, max(known_pe1 / (n_layers - 1), 1.0)), **jac_kws)
+    Pe_opt = deltas_to_Pe(result.x, known_pe1).tolist()
+    recorder.finish(nfev[0], np.append(result.x, Pe_opt[-2]), Pe_opt, 2 * float(result.cost))
 
-    df_history = process_results(param_history)
-    return Pe_opt, df_history
\ No newline at end of file
+    df_history = history_dataframe(recorder, x_data, found_left, found_right, true_left, true_right, Pe)
+    return Pe_opt, df_history
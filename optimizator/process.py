@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def process_results(param_history):
@@ -12,4 +13,64 @@ def process_results(param_history):
         )
         params_df = pd.concat([params_df, pe_df], axis=1)
 
-    return pd.concat([df.drop(columns='parameters'), params_df], axis=1)
\ No newline at end of file
+    return pd.concat([df.drop(columns='parameters'), params_df], axis=1)
+
+# История итераций в предвыделенных массивах по столбцам вместо списка словарей.
+# mode: 'off' - не записывать, 'full' - каждую итерацию, целое k - каждую k-ю и последнюю.
+# Метрика отклонения считается только при сборке таблицы в to_dataframe; столбцы - как у process_results
+class HistoryRecorder:
+    __slots__ = ('param_names', 'every', 'size', 'iterations', 'params', 'Pe', 'residuals')
+
+    def __init__(self, param_names, n_pe, mode='full', capacity=64):
+        self.param_names = list(param_names)
+        self.every = {'off': 0, 'full': 1}[mode] if isinstance(mode, str) else max(int(mode), 1)
+        self.size = 0
+        self.iterations = np.empty(capacity, dtype=int)
+        self.params = np.empty((capacity, len(self.param_names)))
+        self.Pe = np.empty((capacity, n_pe))
+        self.residuals = np.empty(capacity)
+
+    @property
+    def enabled(self):
+        return self.every > 0
+
+    def wants(self, iteration):
+        return self.every > 0 and iteration % self.every == 0
+
+    def grow(self):
+        capacity = 2 * len(self.residuals)
+        for name in ('iterations', 'params', 'Pe', 'residuals'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def record(self, iteration, params, Pe, residual):
+        if self.size == len(self.residuals):
+            self.grow()
+        i = self.size
+        self.iterations[i] = iteration
+        self.params[i] = params
+        self.Pe[i] = Pe
+        self.residuals[i] = residual
+        self.size += 1
+
+    def finish(self, iteration, params, Pe, residual):
+        # в режиме каждой k-й итерации последняя дописывается, если не попала в выборку
+        if self.every > 1 and (self.size == 0 or self.iterations[self.size - 1] != iteration):
+            self.record(iteration, params, Pe, residual)
+
+    def to_dataframe(self, deviation=None):
+        # deviation(матрица Pe) -> метрики отклонения для столбца 'Невязка'; без нее столбец заполняется nan
+        n = self.size
+        Pe = self.Pe[:n]
+        columns = {
+            'Невязка': np.asarray(deviation(Pe), dtype=float) if deviation else np.full(n, np.nan),
+            'Итерация': self.iterations[:n].copy(),
+        }
+        for j, name in enumerate(self.param_names):
+            columns[name] = self.params[:n, j].copy()
+        columns['residuals'] = self.residuals[:n].copy()
+        for i in range(1, Pe.shape[1] - 1):
+            columns[f"Pe_{i}"] = Pe[:, i].copy()
+        return pd.DataFrame(columns)
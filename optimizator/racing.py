@@ -0,0 +1,134 @@
+import time
+import queue
+import multiprocessing
+import numpy as np
+import pandas as pd
+from main_block.data import noise_level
+from main_block.prepared_model import PreparedModel
+from optimizator.bayes_optimizer import run_prepared_bayes_optimization
+from optimizator.optimizer import run_prepared_optimization, calculate_deviation_metric
+
+DEFAULT_PORTFOLIO = ('scipy_trf', 'leastsq', 'nelder', 'powell', 'cobyla')
+
+
+# Метод в отдельном процессе: каждый вызов model.evaluate сообщает лучшую сумму квадратов невязок
+# (не чаще report_interval секунд), в конце - итоговый Pe; evaluate подменяется только у копии модели в процессе
+def race_worker(method, model, y_data, true_left, true_right, Pe, messages, n_trials, report_interval):
+    start_time = time.perf_counter()
+    evaluate = model.evaluate
+    best = {'sse': np.inf, 'Pe': None, 'sent': -np.inf}
+
+    def reporting_evaluate(Pe_current):
+        result = evaluate(Pe_current)
+        sse = float(np.nansum((result - y_data) ** 2))
+        if sse < best['sse']:
+            best['sse'], best['Pe'] = sse, list(np.asarray(Pe_current, dtype=float))
+            elapsed = time.perf_counter() - start_time
+            if elapsed - best['sent'] >= report_interval:
+                best['sent'] = elapsed
+                messages.put(('progress', method, best['sse'], best['Pe'], elapsed))
+        return result
+
+    model.evaluate = reporting_evaluate
+    try:
+        if method == 'bayes':
+            Pe_opt, _ = run_prepared_bayes_optimization(model, y_data, true_left, true_right, Pe, n_trials, history='off')
+        else:
+            Pe_opt, _ = run_prepared_optimization(model, y_data, true_left, true_right, Pe, method, history='off')
+        sse = float(np.nansum((evaluate(Pe_opt) - y_data) ** 2))
+        messages.put(('done', method, sse, list(map(float, Pe_opt)), time.perf_counter() - start_time))
+    except Exception as error:
+        messages.put(('error', method, np.inf, None, time.perf_counter() - start_time, repr(error)))
+
+
+def run_race(x_data, y_data, found_left, found_right, true_left, true_right, Pe, TG0, atg, A,
+             portfolio=DEFAULT_PORTFOLIO, target_residual=None, sigma=None, tolerance=1.05, time_limit=None,
+             lag_factor=10.0, grace=1.0, n_trials=200, report_interval=0.05):
+    model = PreparedModel(x_data, TG0, atg, A, found_left, found_right)
+    return run_prepared_race(model, y_data, true_left, true_right, Pe, portfolio, target_residual, sigma, tolerance,
+                             time_limit, lag_factor, grace, n_trials, report_interval)
+
+
+# Гонка методов на одной подготовленной модели: все методы портфеля запускаются одновременно.
+# Победитель - первый завершившийся метод с суммой квадратов невязок <= target_residual (по умолчанию уровень
+# шума tolerance * N * sigma^2); если таких нет - лучший по невязке после завершения всех или по истечении
+# time_limit (тогда учитываются и промежуточные результаты). Метод, у которого после grace секунд лучшая
+# невязка хуже лидера в lag_factor раз, останавливается. Возвращает Pe победителя, его имя и отчет по методам
+def run_prepared_race(model, y_data, true_left, true_right, Pe, portfolio=DEFAULT_PORTFOLIO, target_residual=None,
+                      sigma=None, tolerance=1.05, time_limit=None, lag_factor=10.0, grace=1.0, n_trials=200,
+                      report_interval=0.05):
+    y_data = np.asarray(y_data, dtype=float)
+    if target_residual is None:
+        fitted = (model.x >= model.left_boundaries[0]) & np.isfinite(y_data)
+        if sigma is None:
+            sigma = noise_level(y_data[fitted])
+        target_residual = tolerance * np.count_nonzero(fitted) * sigma ** 2
+
+    messages = multiprocessing.Queue()
+    processes = {}
+    state = {method: {'method': method, 'status': 'running', 'residuals': np.inf, 'Pe': None, 'time': np.nan}
+             for method in portfolio}
+    for method in portfolio:
+        processes[method] = multiprocessing.Process(
+            target=race_worker, args=(method, model, y_data, true_left, true_right, Pe, messages, n_trials,
+                                      report_interval), daemon=True)
+        processes[method].start()
+
+    start_time = time.perf_counter()
+    winner = None
+    while winner is None and any(row['status'] == 'running' for row in state.values()):
+        elapsed = time.perf_counter() - start_time
+        if time_limit is not None and elapsed >= time_limit:
+            break
+        try:
+            message = messages.get(timeout=0.05 if time_limit is None else max(min(0.05, time_limit - elapsed), 0.0))
+        except queue.Empty:
+            message = None
+
+        if message is not None:
+            kind, method, sse, Pe_current, method_time = message[:5]
+            row = state[method]
+            if row['status'] == 'running':
+                if sse <= row['residuals']:
+                    row['residuals'], row['Pe'] = sse, Pe_current
+                row['time'] = method_time
+                if kind == 'done':
+                    row['status'] = 'done'
+                    if sse <= target_residual:
+                        winner = method
+                elif kind == 'error':
+                    row['status'], row['error'] = 'error', message[5]
+
+        # отставшие: лучшая невязка хуже лидера в lag_factor раз
+        elapsed = time.perf_counter() - start_time
+        leader = min(row['residuals'] for row in state.values())
+        if elapsed >= grace and np.isfinite(leader):
+            for method, row in state.items():
+                if row['status'] == 'running' and row['residuals'] > lag_factor * leader:
+                    processes[method].terminate()
+                    row['status'], row['time'] = 'killed', elapsed
+
+    for method, process in processes.items():
+        if process.is_alive():
+            process.terminate()
+            if state[method]['status'] == 'running':
+                state[method]['status'] = 'stopped'
+                state[method]['time'] = time.perf_counter() - start_time
+        process.join()
+
+    # без выхода на цель: лучший завершившийся, иначе лучший промежуточный
+    if winner is None:
+        candidates = [row for row in state.values() if row['status'] == 'done'] or \
+                     [row for row in state.values() if row['Pe'] is not None]
+        if not candidates:
+            raise RuntimeError("Ни один метод не вернул решения")
+        winner = min(candidates, key=lambda row: row['residuals'])['method']
+
+    report = pd.DataFrame(list(state.values()))
+    report['winner'] = report['method'] == winner
+    report['reached_target'] = report['residuals'] <= target_residual
+    report['Невязка'] = [
+        calculate_deviation_metric(model.x, model.left_boundaries, model.right_boundaries, true_left, true_right,
+                                   Pe, row['Pe']) if row['Pe'] is not None else np.nan
+        for row in state.values()]
+    return state[winner]['Pe'], winner, report
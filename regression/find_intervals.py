@@ -1,13 +1,148 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
-from main_block.data import smooth_data, data_norm, generate_data, noize_data
-from regression.global_models import model_ws, model_ms, predict_params
+from main_block.data import smooth_data, data_norm, generate_data, noize_data, noise_level
+from regression.global_models import get_models, predict_params
 from regression.metrics import calculate_mae, calculate_mse, calculate_rmse, calculate_relative_mae
 
-def calculate_window_slope(z_window, T_window):
-    model = LinearRegression().fit(z_window, T_window)
-    return model.coef_[0]
+def range_sums(z_all, T_all, block_size=None):
+    # Суммы для МНК-прямых на любых участках [a, b) профиля. Разности одной кумулятивной суммы по всему
+    # профилю теряют точность на коротких участках длинных профилей (ошибка растет как N^2), поэтому суммы
+    # двухуровневые: внутри блока - от среднего этого блока, по целым блокам - от общего среднего
+    # (участок из целых блоков не короче блока, и потеря точности на нем мала).
+    # T может быть матрицей R x N на общей сетке z, участки идут по последней оси
+    z = np.asarray(z_all, dtype=float)
+    T = np.asarray(T_all, dtype=float)
+    n = z.shape[-1]
+    if block_size is None:
+        block_size = max(int(np.sqrt(n)), 32)
+    block_size = max(min(block_size, n), 1)
+    n_blocks = -(-n // block_size)
+    pad = n_blocks * block_size - n
+    z_blocks = np.pad(z, (0, pad), mode='edge').reshape(n_blocks, block_size)
+    T_blocks = np.pad(T, [(0, 0)] * (T.ndim - 1) + [(0, pad)], mode='edge').reshape(
+        T.shape[:-1] + (n_blocks, block_size))
+
+    z_ref = z_blocks.mean(axis=-1)
+    T_ref = T_blocks.mean(axis=-1)
+    z_local = z_blocks - z_ref[:, None]
+    T_local = T_blocks - T_ref[..., None]
+    z_mean = z.mean()
+    T_mean = T.mean(axis=-1, keepdims=True)
+    z_global = z_blocks - z_mean
+    T_global = T_blocks - T_mean[..., None]
+
+    def local_prefix(values):
+        prefix = np.zeros(values.shape[:-1] + (block_size + 1,))
+        np.cumsum(values, axis=-1, out=prefix[..., 1:])
+        return prefix
+
+    def block_prefix(values):
+        prefix = np.zeros(values.shape[:-2] + (n_blocks + 1,))
+        np.cumsum(values.sum(axis=-1), axis=-1, out=prefix[..., 1:])
+        return prefix
+
+    return {
+        'n': n, 'block_size': block_size,
+        'z_ref': z_ref, 'T_ref': T_ref, 'z_mean': z_mean, 'T_mean': T_mean,
+        'local': [local_prefix(values) for values in (z_local, T_local, z_local * z_local,
+                                                      z_local * T_local, T_local * T_local)],
+        'blocks': [block_prefix(values) for values in (z_global, T_global, z_global * z_global,
+                                                       z_global * T_global, T_global * T_global)],
+    }
+
+
+def range_moments(sums, a, b):
+    # Число точек и центральные суммы S_xx, S_xy, S_yy на участках [a, b) (массивы одной формы).
+    # Участок делится на хвосты в крайних блоках и целые блоки между ними, части объединяются
+    # формулой Чана для центральных моментов. S_xx меньше ошибки округления (одна точка или
+    # одинаковые z) обнуляется, наклон на таком участке считается нулевым
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    size = sums['block_size']
+    first = a // size
+    last = np.maximum(b - 1, a) // size
+
+    def centered(count, z_ref, T_ref, S_z, S_T, S_zz, S_zT, S_TT):
+        safe = np.maximum(count, 1)
+        return (count, z_ref + S_z / safe, T_ref + S_T / safe,
+                S_zz - S_z * S_z / safe, S_zT - S_z * S_T / safe, S_TT - S_T * S_T / safe)
+
+    def in_block(block, start, stop):
+        S_z, S_T, S_zz, S_zT, S_TT = (prefix[..., block, stop] - prefix[..., block, start]
+                                      for prefix in sums['local'])
+        return centered(stop - start, sums['z_ref'][block], sums['T_ref'][..., block],
+                        S_z, S_T, S_zz, S_zT, S_TT), S_zz
+
+    def combine(p, q):
+        n_p, z_p, T_p, zz_p, zT_p, TT_p = p
+        n_q, z_q, T_q, zz_q, zT_q, TT_q = q
+        count = n_p + n_q
+        safe = np.maximum(count, 1)
+        weight = n_p * n_q / safe
+        d_z, d_T = z_q - z_p, T_q - T_p
+        return (count, z_p + d_z * n_q / safe, T_p + d_T * n_q / safe, zz_p + zz_q + weight * d_z * d_z,
+                zT_p + zT_q + weight * d_z * d_T, TT_p + TT_q + weight * d_T * d_T)
+
+    head, head_scale = in_block(first, a - first * size, np.minimum(b, (first + 1) * size) - first * size)
+    has_tail = last > first
+    tail, tail_scale = in_block(last, np.zeros_like(last), np.where(has_tail, b - last * size, 0))
+    block_from = first + 1
+    block_to = np.maximum(last, block_from)
+    middle = centered((block_to - block_from) * size, sums['z_mean'], sums['T_mean'],
+                      *(prefix[..., block_to] - prefix[..., block_from] for prefix in sums['blocks']))
+
+    count, _, _, S_xx, S_xy, S_yy = combine(combine(head, middle), tail)
+    degenerate = (count < 2) | (S_xx <= 1e-10 * (head_scale + tail_scale + middle[3]))
+    return count, np.where(degenerate, 0.0, S_xx), S_xy, S_yy
+
+
+def regression_slopes(S_xx, S_xy):
+    slopes = np.zeros(np.broadcast(S_xx, S_xy).shape)
+    np.divide(S_xy, S_xx, out=slopes, where=S_xx > 0)
+    return slopes
+
+
+def window_slopes(z_all, T_smooth, window_size):
+    # Наклоны МНК-прямых во всех окнах длины window_size (окно из одной точки дает нулевой наклон).
+    # T_smooth может быть матрицей R x N (профили на общей сетке z), окна идут по последней оси
+    T = np.asarray(T_smooth, dtype=float)
+    starts = np.arange(max(T.shape[-1] - window_size + 1, 0))
+    if starts.size == 0:
+        return np.zeros(T.shape[:-1] + (0,))
+    _, S_xx, S_xy, _ = range_moments(range_sums(z_all, T), starts, starts + window_size)
+    return regression_slopes(S_xx, S_xy)
+
+
+def slope_pyramid(z_all, T_smooth, window_sizes):
+    # Матрица наклонов (размер окна x позиция) по общим суммам range_sums: строка w, столбец i -
+    # наклон в окне [i, i + window_sizes[w]); окна, выходящие за конец профиля, равны NaN
+    n = len(z_all)
+    window_sizes = np.asarray(window_sizes, dtype=np.int64)[:, None]
+    start = np.broadcast_to(np.arange(n), (window_sizes.shape[0], n))
+    stop = start + window_sizes
+    _, S_xx, S_xy, _ = range_moments(range_sums(z_all, T_smooth), start, np.minimum(stop, n))
+    slopes = regression_slopes(S_xx, S_xy)
+    slopes[stop > n] = np.nan
+    return slopes
+
+
+def window_cover(slopes, window_size, n):
+    # Для каждой точки - максимальный наклон среди окон, которые ее покрывают (-inf, если таких нет)
+    cover = np.full(n, -np.inf)
+    if slopes.size:
+        padding = np.full(window_size - 1, -np.inf)
+        padded = np.concatenate((padding, slopes, padding))
+        cover[:slopes.size + window_size - 1] = np.lib.stride_tricks.sliding_window_view(
+            padded, window_size).max(axis=1)
+    return cover
+
+
+def cover_pyramid(pyramid, window_sizes):
+    # Покрытие для всех размеров окна: маски detect_growth_with_noise при пороге t - это cover > t,
+    # поэтому выбор окна и оценки устойчивости сводятся к редукциям по этой матрице
+    n = pyramid.shape[1]
+    return np.vstack([window_cover(row[:n - window_size], window_size, n)
+                      for row, window_size in zip(pyramid, window_sizes)])
 
 
 def detect_growth_without_noise(T_smooth):
@@ -16,23 +151,83 @@ def detect_growth_without_noise(T_smooth):
 
 
 def detect_growth_with_noise(T_smooth, z_all, window_size, min_slope):
-    filtered_intervals = np.zeros_like(T_smooth, dtype=bool)
-    for i in range(len(z_all) - window_size):
-        z_window = np.array(z_all[i:i + window_size]).reshape(-1, 1)
-        T_window = np.array(T_smooth[i:i + window_size])
-        slope = calculate_window_slope(z_window, T_window)
-        if slope > min_slope:
-            filtered_intervals[i:i + window_size] = True
-    return filtered_intervals
+    # Окна с наклоном больше min_slope помечаются через разностный массив: +1 в начале окна, -1 после конца
+    slopes = window_slopes(z_all, T_smooth, window_size)[:len(z_all) - window_size]
+    window_starts = np.flatnonzero(slopes > min_slope)
+    coverage = np.zeros(len(T_smooth) + 1, dtype=np.int64)
+    np.add.at(coverage, window_starts, 1)
+    np.add.at(coverage, window_starts + window_size, -1)
+    return np.cumsum(coverage[:-1]) > 0
+
+
+class SlopeThresholdIndex:
+    # Индекс по порогу min_slope для одного окна: наклоны считаются один раз, дальше
+    # интервалы для любого порога t находятся за O(log N + k).
+    # Точка j входит в маску, если max наклона покрывающих ее окон cover[j] > t, поэтому
+    # переход маски между j - 1 и j есть ровно при min(cover) <= t < max(cover) на этой паре;
+    # такие отрезки [lo, hi) хранятся в дереве интервалов с центрами
+    def __init__(self, T_smooth, z_all, window_size, cover=None):
+        n = len(z_all)
+        if cover is None:
+            cover = window_cover(window_slopes(z_all, T_smooth, window_size)[:n - window_size], window_size, n)
+
+        self.n = n
+        self.cover = cover
+        # первая точка маски не учитывается при поиске границ
+        previous = np.concatenate(([-np.inf], cover[1:-1]))
+        self.lo = np.minimum(previous, cover[1:])
+        self.hi = np.maximum(previous, cover[1:])
+        self.nodes = []
+        self.root = self.build(np.flatnonzero(self.lo < self.hi))
+
+    def build(self, ids):
+        if ids.size == 0:
+            return -1
+        lo, hi = self.lo[ids], self.hi[ids]
+        center = np.partition(lo, ids.size // 2)[ids.size // 2]
+
+        here = ids[(lo <= center) & (hi > center)]
+        by_lo = here[np.argsort(self.lo[here], kind='stable')]
+        by_hi = here[np.argsort(-self.hi[here], kind='stable')]
+        node = len(self.nodes)
+        self.nodes.append(None)
+        left = self.build(ids[hi <= center])
+        right = self.build(ids[lo > center])
+        self.nodes[node] = (center, by_lo, self.lo[by_lo], by_hi, -self.hi[by_hi], left, right)
+        return node
+
+    def interval_indices(self, min_slope):
+        found = []
+        node = self.root
+        while node != -1:
+            center, by_lo, lo_sorted, by_hi, neg_hi_sorted, left, right = self.nodes[node]
+            if min_slope < center:
+                found.append(by_lo[:np.searchsorted(lo_sorted, min_slope, side='right')])
+                node = left
+            else:
+                found.append(by_hi[:np.searchsorted(neg_hi_sorted, -min_slope, side='left')])
+                node = right
+
+        # номер пары j соответствует переходу между точками j и j + 1, как i - 1 в get_interval_boundaries
+        changes = np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+        rising = self.cover[changes + 1] > min_slope
+        start_indices = changes[rising]
+        end_indices = changes[~rising]
+        if end_indices.size:
+            end_indices[-1] = self.n - 1
+        return start_indices, end_indices
+
+    def filtered_intervals(self, min_slope):
+        return self.cover > min_slope
 
 
 def find_growth_intervals(T_smooth, z_all, sigma, model_ws=None, model_ms=None, Pe0=None, A=None, N=None,
-                          fixed_ws=None, fixed_ms=None):
+                          fixed_ws=None, fixed_ms=None, predictor=None):
     if fixed_ws is not None and fixed_ms is not None:
         window_size = int(round(fixed_ws))
         min_slope = fixed_ms
     else:
-        window_size, min_slope = predict_params(Pe0, A, sigma, N, model_ws, model_ms)
+        window_size, min_slope = predict_params(Pe0, A, sigma, N, model_ws, model_ms, predictor)
 
     if window_size <= 1:
         window_size = 2
@@ -47,27 +242,19 @@ def normalize_to_original_scale(boundaries, z_min, z_max):
 
 
 def get_interval_boundaries(filtered_intervals, z_all):
-    start_indices = []
-    end_indices = []
-    left_boundaries = []
-    right_boundaries = []
-    in_interval = False
-
-    for i in range(1, len(z_all)):
-        if filtered_intervals[i] and not in_interval:
-            start_indices.append(i - 1)
-            left_boundaries.append(z_all[i - 1])
-            in_interval = True
-        elif not filtered_intervals[i] and in_interval:
-            end_indices.append(i - 1)
-            right_boundaries.append(z_all[i - 1])
-            in_interval = False
-
-    if end_indices and end_indices[-1] < len(z_all) - 1:
+    # Первая точка маски не учитывается: интервал может начаться не раньше i = 1
+    mask = np.asarray(filtered_intervals, dtype=bool).copy()
+    mask[:1] = False
+    changes = np.flatnonzero(np.diff(mask.view(np.int8)))
+    start_indices = changes[mask[changes + 1]]
+    end_indices = changes[~mask[changes + 1]]
+
+    # последний закрытый интервал продлевается до конца профиля
+    if end_indices.size:
         end_indices[-1] = len(z_all) - 1
-        right_boundaries[-1] = z_all[-1]
 
-    return left_boundaries, right_boundaries, start_indices, end_indices
+    z_all = np.asarray(z_all)
+    return z_all[start_indices], z_all[end_indices], start_indices, end_indices
 
 
 def process_detected_boundaries(start_indices, end_indices, z_norm, z_all):
@@ -85,47 +272,195 @@ def process_detected_boundaries(start_indices, end_indices, z_norm, z_all):
 
 
 def merge_growth_intervals_by_gap(start_indices, end_indices, z_norm, max_gap=0.04):
-    if len(start_indices) == 0:
-        return [], []
+    start_indices = np.asarray(start_indices, dtype=np.int64)
+    end_indices = np.asarray(end_indices, dtype=np.int64)
+    if start_indices.size == 0:
+        return start_indices, end_indices
+
+    # Разрыв до предыдущего интервала не зависит от слияний: конец объединенной группы - всегда конец предыдущего
+    gaps = z_norm[start_indices[1:]] - z_norm[end_indices[:-1]]
+    separated = gaps > max_gap
+    merged_starts = start_indices[np.concatenate(([True], separated))]
+    merged_ends = end_indices[np.concatenate((separated, [True]))]
+    return merged_starts, merged_ends
 
-    merged_starts = [start_indices[0]]
-    merged_ends = [end_indices[0]]
 
-    for i in range(1, len(start_indices)):
-        gap = z_norm[start_indices[i]] - z_norm[merged_ends[-1]]
-        if gap <= max_gap:
-            merged_ends[-1] = end_indices[i]
-        else:
-            merged_starts.append(start_indices[i])
-            merged_ends.append(end_indices[i])
+def remove_short_intervals(start_indices, end_indices, z_norm, min_length=0.01):
+    start_indices = np.asarray(start_indices, dtype=np.int64)
+    end_indices = np.asarray(end_indices, dtype=np.int64)
+    keep = z_norm[end_indices] - z_norm[start_indices] >= min_length
+    return start_indices[keep], end_indices[keep]
+
+
+def detect_growth_with_noise_batch(T_smooth, z_all, window_size, min_slope):
+    slopes = window_slopes(z_all, T_smooth, window_size)[:, :len(z_all) - window_size]
+    rows, window_starts = np.nonzero(slopes > min_slope)
+    coverage = np.zeros((T_smooth.shape[0], T_smooth.shape[1] + 1), dtype=np.int64)
+    np.add.at(coverage, (rows, window_starts), 1)
+    np.add.at(coverage, (rows, window_starts + window_size), -1)
+    return np.cumsum(coverage[:, :-1], axis=1) > 0
+
+
+def get_interval_boundaries_batch(filtered_intervals, z_all):
+    # Те же правила, что в get_interval_boundaries, для каждой строки маски R x N;
+    # интервалы всех строк лежат подряд, rows - номер строки каждого интервала
+    mask = np.asarray(filtered_intervals, dtype=bool).copy()
+    mask[:, :1] = False
+    change_rows, changes = np.nonzero(np.diff(mask.view(np.int8), axis=1))
+    rising = mask[change_rows, changes + 1]
+    rows, start_indices = change_rows[rising], changes[rising]
+    end_rows, end_indices = change_rows[~rising], changes[~rising]
+
+    last_in_row = np.append(end_rows[1:] != end_rows[:-1], True)
+    end_indices[last_in_row] = len(z_all) - 1
+    return rows, start_indices, end_indices
+
+
+def merge_growth_intervals_by_gap_batch(rows, start_indices, end_indices, z_norm, max_gap=0.04):
+    if start_indices.size == 0:
+        return rows, start_indices, end_indices
+    gaps = z_norm[start_indices[1:]] - z_norm[end_indices[:-1]]
+    separated = (gaps > max_gap) | (rows[1:] != rows[:-1])
+    first = np.concatenate(([True], separated))
+    last = np.concatenate((separated, [True]))
+    return rows[first], start_indices[first], end_indices[last]
+
+
+def get_boundaries_batch(x_data, Y_noize, Pe, N, sigma, A, model_ws=None, model_ms=None,
+                         fixed_ws=None, fixed_ms=None, predictor=None):
+    # Поиск интервалов для R реализаций на общей сетке x_data; возвращает списки границ длины R
+    Y_noize = np.atleast_2d(np.asarray(Y_noize, dtype=float))
+    z_norm = (x_data - x_data.min()) / (x_data.max() - x_data.min())
+    T_min = Y_noize.min(axis=1, keepdims=True)
+    T_max = Y_noize.max(axis=1, keepdims=True)
+    T_smooth = np.vstack([smooth_data(row) for row in (Y_noize - T_min) / (T_max - T_min)])
 
-    return merged_starts, merged_ends
+    if fixed_ws is not None and fixed_ms is not None:
+        window_size = int(round(fixed_ws))
+        min_slope = fixed_ms
+    else:
+        window_size, min_slope = predict_params(Pe[0], A, sigma, N, model_ws, model_ms, predictor)
+    if window_size <= 1:
+        window_size = 2
 
+    if sigma == 0:
+        filtered_intervals = np.gradient(T_smooth, axis=1) > 1e-6
+    else:
+        filtered_intervals = detect_growth_with_noise_batch(T_smooth, z_norm, window_size, min_slope)
+
+    rows, starts, ends = get_interval_boundaries_batch(filtered_intervals, z_norm)
+    rows, starts, ends = merge_growth_intervals_by_gap_batch(rows, starts, ends, z_norm, max_gap=0.01)
+    keep = z_norm[ends] - z_norm[starts] >= 0.01
+    rows, starts, ends = rows[keep], starts[keep], ends[keep]
+
+    z_min, z_max = x_data.min(), x_data.max()
+    split_at = np.cumsum(np.bincount(rows, minlength=len(Y_noize)))[:-1]
+    left_boundaries = [normalize_to_original_scale(z_norm[row], z_min, z_max)
+                       for row in np.split(starts, split_at)]
+    right_boundaries = [normalize_to_original_scale(z_norm[row], z_min, z_max)
+                        for row in np.split(ends, split_at)]
+    return left_boundaries, right_boundaries
 
-def remove_short_intervals(start_indices, end_indices, z_norm, min_length=0.01):
-    filtered_starts = []
-    filtered_ends = []
 
-    for start, end in zip(start_indices, end_indices):
-        length = z_norm[end] - z_norm[start]
-        if length >= min_length:
-            filtered_starts.append(start)
-            filtered_ends.append(end)
+def segment_fit(sums, a, b):
+    # Остаточная сумма квадратов, наклон и разброс z для участков [a, b) (массивы одной длины),
+    # sums - суммы range_sums профиля
+    _, S_xx, S_xy, S_yy = range_moments(sums, a, b)
+    slope = regression_slopes(S_xx, S_xy)
+    return np.maximum(S_yy - slope * S_xy, 0.0), slope, S_xx
+
+
+def pelt_segmentation(sums, penalty, min_size=3):
+    # PELT: точное минимальное значение суммы стоимостей участков + penalty за каждый участок,
+    # кандидаты, которые уже не могут дать минимум, отбрасываются
+    n = sums['n']
+    F = np.full(n + 1, np.inf)
+    F[0] = -penalty
+    last = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0])
+
+    for t in range(min_size, n + 1):
+        cost, _, _ = segment_fit(sums, candidates, np.full(candidates.size, t))
+        values = F[candidates] + cost
+        best = np.argmin(values)
+        F[t] = values[best] + penalty
+        last[t] = candidates[best]
+
+        candidates = candidates[values <= F[t]]
+        if t - min_size + 1 >= min_size:
+            candidates = np.append(candidates, t - min_size + 1)
+
+    change_points = [n]
+    while change_points[-1] > 0:
+        change_points.append(last[change_points[-1]])
+    return np.array(change_points[::-1])
+
+
+def binary_segmentation(sums, penalty, min_size=3):
+    # Бинарная сегментация: участок делится в лучшей точке, пока выигрыш в стоимости больше penalty
+    n = sums['n']
+    change_points = [0, n]
+    stack = [(0, n)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2 * min_size:
+            continue
+        split = np.arange(a + min_size, b - min_size + 1)
+        total, _, _ = segment_fit(sums, np.array([a]), np.array([b]))
+        left, _, _ = segment_fit(sums, np.full(split.size, a), split)
+        right, _, _ = segment_fit(sums, split, np.full(split.size, b))
+        gain = total[0] - left - right
+        best = np.argmax(gain)
+        if gain[best] > penalty:
+            change_points.append(split[best])
+            stack += [(a, split[best]), (split[best], b)]
+    return np.array(sorted(change_points))
+
+
+def detect_growth_changepoints(z_norm, T_norm, method='pelt', beta=2.0, significance=5.0, min_size=3):
+    # Профиль делится на участки с постоянной производной (кусочно-линейная МНК-аппроксимация),
+    # штраф за участок 2 * beta * sigma^2 * ln N, sigma - шум по вторым разностям (MAD).
+    # Участок считается ростом, если наклон больше significance стандартных ошибок наклона;
+    # подряд идущие участки роста дают один интервал, последний продлевается до конца профиля
+    n = len(z_norm)
+    sigma = noise_level(T_norm, min_level=1e-6)
+    sums = range_sums(z_norm, T_norm)
+    penalty = 2 * beta * sigma ** 2 * np.log(n)
+
+    if method == 'pelt':
+        change_points = pelt_segmentation(sums, penalty, min_size)
+    elif method == 'binseg':
+        change_points = binary_segmentation(sums, penalty, min_size)
+    else:
+        raise ValueError(f"Неизвестный метод поиска точек изменения: {method}")
 
-    return filtered_starts, filtered_ends
+    a, b = change_points[:-1], change_points[1:]
+    _, slope, S_xx = segment_fit(sums, a, b)
+    growth = np.concatenate(([0], slope > significance * sigma / np.sqrt(S_xx), [0])).astype(np.int8)
+    edges = np.diff(growth)
+    start_indices = a[np.flatnonzero(edges == 1)]
+    end_indices = b[np.flatnonzero(edges == -1) - 1] - 1
+    if end_indices.size:
+        end_indices[-1] = n - 1
+    return start_indices, end_indices
 
 
 def get_boundaries(x_data, y_data_noize, Pe, N, sigma, A, model_ws=None, model_ms=None,
-                   fixed_ws=None, fixed_ms=None):
+                   fixed_ws=None, fixed_ms=None, backend='window', changepoint_method='pelt', predictor=None):
+    if backend not in ('window', 'changepoint'):
+        raise ValueError(f"Неизвестный способ поиска интервалов: {backend}")
     z_norm, T_noisy_norm = data_norm(x_data, y_data_noize)
-    T_smooth = smooth_data(T_noisy_norm)
-    filtered_intervals = find_growth_intervals(
-        T_smooth, z_norm, sigma,
-        model_ws=model_ws, model_ms=model_ms, Pe0=Pe[0], A=A, N=N,
-        fixed_ws=fixed_ws, fixed_ms=fixed_ms
-    )
+    if backend == 'changepoint':
+        starts, ends = detect_growth_changepoints(z_norm, T_noisy_norm, method=changepoint_method)
+    else:
+        T_smooth = smooth_data(T_noisy_norm)
+        filtered_intervals = find_growth_intervals(
+            T_smooth, z_norm, sigma,
+            model_ws=model_ws, model_ms=model_ms, Pe0=Pe[0], A=A, N=N,
+            fixed_ws=fixed_ws, fixed_ms=fixed_ms, predictor=predictor
+        )
+        left, right, starts, ends = get_interval_boundaries(filtered_intervals, z_norm)
 
-    left, right, starts, ends = get_interval_boundaries(filtered_intervals, z_norm)
     starts, ends = merge_growth_intervals_by_gap(starts, ends, z_norm, max_gap=0.01)
     starts, ends = remove_short_intervals(starts, ends, z_norm, min_length=0.01)
     left_boundaries, right_boundaries = process_detected_boundaries(starts, ends, z_norm, x_data)
@@ -167,6 +502,7 @@ def main():
     TG0 = 1
     atg = 0.0001
     A = 2
+    model_ws, model_ms = get_models()
 
     x_data, y_data = generate_data(boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, N)
     y_data_noize = noize_data(y_data, sigma)
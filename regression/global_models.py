@@ -1,13 +1,28 @@
 import os
+import hashlib
+import threading
+import joblib
 import pandas as pd
+import sklearn
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.model_selection import train_test_split
+from regression.lookup_predictor import LookupTablePredictor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINING_DATA_PATH = os.path.join(BASE_DIR, 'regression', 'training_data.txt')
+MODELS_PATH = os.path.join(BASE_DIR, 'regression', 'meta_models.joblib')
+# Увеличивается при любом изменении train_models или состава артефакта, чтобы старый артефакт пересобирался
+MODELS_VERSION = 2
+# 'gbr' - сами метамодели; 'lookup' (интерполяция по решетке) быстрее, но заметно расходится с ними
+# по window_size (см. models_test/lookup_accuracy.py), поэтому включается только явно: predictor='lookup'
+DEFAULT_PREDICTOR = 'gbr'
+
+_artifact = None
+_artifact_lock = threading.Lock()
+
 
 def load_training_data():
-    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    RELATIVE_PATH = os.path.join('regression', 'training_data.txt')
-    FULL_PATH = os.path.join(BASE_DIR, RELATIVE_PATH)
-    return pd.read_csv(FULL_PATH, sep='\t')
+    return pd.read_csv(TRAINING_DATA_PATH, sep='\t')
 
 
 def train_models(df):
@@ -25,12 +40,84 @@ def train_models(df):
 
     return model_ws, model_ms
 
-df = load_training_data()
-model_ws, model_ms = train_models(df)
+
+def training_data_hash():
+    with open(TRAINING_DATA_PATH, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+# Ключ артефакта: версия кода обучения, хеш обучающей выборки и версия sklearn (pickle между версиями несовместим)
+def artifact_key():
+    return {'version': MODELS_VERSION, 'data_hash': training_data_hash(), 'sklearn': sklearn.__version__}
+
+
+def load_artifact(key):
+    try:
+        artifact = joblib.load(MODELS_PATH)
+    except Exception:
+        return None
+    if not isinstance(artifact, dict) or artifact.get('key') != key:
+        return None
+    return artifact
+
+
+def save_artifact(artifact):
+    # запись во временный файл и os.replace: параллельные процессы не увидят недописанный артефакт
+    tmp_path = f"{MODELS_PATH}.{os.getpid()}.tmp"
+    try:
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, MODELS_PATH)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_artifact(force=False):
+    key = artifact_key()
+    artifact = None if force else load_artifact(key)
+    if artifact is None:
+        df = load_training_data()
+        model_ws, model_ms = train_models(df)
+        lookup = LookupTablePredictor.from_models(df, model_ws, model_ms)
+        artifact = {'key': key, 'model_ws': model_ws, 'model_ms': model_ms, 'lookup': lookup}
+        save_artifact(artifact)
+    return artifact
+
+
+# Метамодели загружаются при первом обращении (в процессах-воркерах тоже - из артефакта, без переобучения)
+def get_artifact():
+    global _artifact
+    if _artifact is None:
+        with _artifact_lock:
+            if _artifact is None:
+                _artifact = build_artifact()
+    return _artifact
+
+
+def get_models():
+    artifact = get_artifact()
+    return artifact['model_ws'], artifact['model_ms']
+
+
+def get_lookup():
+    return get_artifact()['lookup']
+
+
+def __getattr__(name):
+    # совместимость со старым импортом: from regression.global_models import model_ws, model_ms
+    if name in ('model_ws', 'model_ms'):
+        return get_artifact()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def predict_params(Pe0, A, sigma, N, model_ws, model_ms):
+# Явно переданные модели используются как есть; иначе - predictor (по умолчанию DEFAULT_PREDICTOR):
+# 'gbr' (сами метамодели) или 'lookup' (интерполяция по решетке обучающей выборки)
+def predict_params(Pe0, A, sigma, N, model_ws=None, model_ms=None, predictor=None):
+    if model_ws is None or model_ms is None:
+        if (predictor or DEFAULT_PREDICTOR) == 'lookup':
+            return get_lookup().predict(Pe0, A, sigma, N)
+        model_ws, model_ms = get_models()
     x_input = pd.DataFrame([[Pe0, A, sigma, N]], columns=["Pe0", "A", "sigma", "N"])
     ws = model_ws.predict(x_input)[0]
     ms = model_ms.predict(x_input)[0]
-    return int(round(ws)), round(ms, 3)
\ No newline at end of file
+    return int(round(ws)), round(ms, 3)
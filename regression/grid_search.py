@@ -4,38 +4,38 @@ import pandas as pd
 from tqdm import tqdm
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from main_block.data import smooth_data, generate_data
-from regression.find_intervals import get_interval_boundaries
+from main_block.data import smooth_data, generate_data, noize_data, data_norm
+from regression.find_intervals import SlopeThresholdIndex, normalize_to_original_scale, slope_pyramid, cover_pyramid
 from regression.metrics import calculate_boundary_errors
 
-def evaluate_pipeline(regression_window_size, min_slope, Pe, A, sigma, N, boundary_dict, TG0=1, atg=0.0001, zInf=100000):
-    try:
-        z_norm, T_true_norm, T_noisy_norm, z_all, T_true, T_noisy = generate_data(
-            boundary_dict['left'], boundary_dict['right'], Pe, zInf, TG0, atg, A, sigma, N)
-
-        T_smooth = smooth_data(T_noisy_norm)
-        filtered = np.zeros_like(T_smooth, dtype=bool)
+def prepare_profile(Pe, A, sigma, N, boundary_dict, TG0=1, atg=0.0001):
+    x_data, y_data = generate_data(boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, N)
+    z_norm, T_noisy_norm = data_norm(x_data, noize_data(y_data, sigma))
+    return x_data, z_norm, smooth_data(T_noisy_norm)
 
-        for i in range(len(z_norm) - regression_window_size):
-            z_window = np.array(z_norm[i:i + regression_window_size]).reshape(-1, 1)
-            T_window = T_smooth[i:i + regression_window_size]
-            model = LinearRegression().fit(z_window, T_window)
-            slope = model.coef_[0]
-            if slope > min_slope:
-                filtered[i:i + regression_window_size] = True
 
-        found_left, found_right, *_ = get_interval_boundaries(filtered, z_norm)
+def threshold_errors(index, min_slopes, x_data, z_norm, boundary_dict):
+    # Ошибки границ для каждого порога из min_slopes по одному SlopeThresholdIndex
+    z_min, z_max = x_data.min(), x_data.max()
+    errors = []
+    for min_slope in min_slopes:
+        starts, ends = index.interval_indices(min_slope)
+        if len(starts) != len(boundary_dict['left']):
+            errors.append(None)
+            continue
 
-        z_min, z_max = z_all.min(), z_all.max()
-        found_left = [z_min + b * (z_max - z_min) for b in found_left]
-        found_right = [z_min + b * (z_max - z_min) for b in found_right]
+        found_left = normalize_to_original_scale(z_norm[starts], z_min, z_max)
+        found_right = normalize_to_original_scale(z_norm[ends], z_min, z_max)
+        mae, _ = calculate_boundary_errors(boundary_dict['left'], boundary_dict['right'], found_left, found_right)
+        errors.append(mae)
+    return errors
 
-        if len(found_left) != len(boundary_dict['left']):
-            return None
 
-        mae, _ = calculate_boundary_errors(boundary_dict['left'], boundary_dict['right'], found_left, found_right)
-        return mae
+def evaluate_pipeline(regression_window_size, min_slope, Pe, A, sigma, N, boundary_dict, TG0=1, atg=0.0001):
+    try:
+        x_data, z_norm, T_smooth = prepare_profile(Pe, A, sigma, N, boundary_dict, TG0, atg)
+        index = SlopeThresholdIndex(T_smooth, z_norm, regression_window_size)
+        return threshold_errors(index, [min_slope], x_data, z_norm, boundary_dict)[0]
     except Exception as e:
         print(f"Ошибка в evaluate_pipeline: {e}")
         return None
@@ -45,12 +45,20 @@ def optimize_params_grid(Pe, A, sigma, N, boundary_dict):
     best_error = float("inf")
     best_params = None
 
-    for window_size in range(3, 22):
-        for min_slope in np.linspace(0.01, 0.5, 20):
-            error = evaluate_pipeline(window_size, min_slope, Pe, A, sigma, N, boundary_dict)
+    # Один зашумленный профиль на всю сетку; наклоны для всех окон считаются одним вызовом
+    # slope_pyramid, а все пороги min_slope перебираются по индексу
+    x_data, z_norm, T_smooth = prepare_profile(Pe, A, sigma, N, boundary_dict)
+    window_sizes = np.arange(3, 22)
+    min_slopes = np.linspace(0.01, 0.5, 20)
+    covers = cover_pyramid(slope_pyramid(z_norm, T_smooth, window_sizes), window_sizes)
+
+    for window_size, cover in zip(window_sizes, covers):
+        index = SlopeThresholdIndex(T_smooth, z_norm, window_size, cover=cover)
+        errors = threshold_errors(index, min_slopes, x_data, z_norm, boundary_dict)
+        for min_slope, error in zip(min_slopes, errors):
             if error is not None and error < best_error:
                 best_error = error
-                best_params = {"window_size": window_size, "min_slope": min_slope}
+                best_params = {"window_size": int(window_size), "min_slope": min_slope}
 
     return best_params
 
@@ -0,0 +1,51 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+FEATURES = ["Pe0", "A", "sigma", "N"]
+
+
+# Предсказание window_size и min_slope мультилинейной интерполяцией по регулярной решетке (Pe0, A, sigma, N)
+# обучающей выборки; значения в узлах - предсказания метамоделей, вне решетки аргументы прижимаются к краям.
+# Обе величины хранятся в одной таблице формы (n_Pe0, n_A, n_sigma, n_N, 2) и интерполируются вместе
+class LookupTablePredictor:
+    def __init__(self, axes, table):
+        self.axes = [np.asarray(axis, dtype=float) for axis in axes]
+        self.table = np.asarray(table, dtype=float)
+        # 16 вершин ячейки: смещения индексов по каждой оси
+        self.corners = np.array(list(itertools.product((0, 1), repeat=len(self.axes))))
+
+    @classmethod
+    def from_models(cls, df, model_ws, model_ms, subdivisions=1):
+        # subdivisions > 1 - каждый шаг решетки делится на части, таблица точнее повторяет ступени GBR
+        axes = []
+        for name in FEATURES:
+            nodes = np.unique(df[name].to_numpy(dtype=float))
+            steps = np.linspace(nodes[:-1], nodes[1:], subdivisions, endpoint=False, axis=1).ravel()
+            axes.append(np.append(steps, nodes[-1]))
+        nodes = pd.DataFrame(np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(axes)),
+                             columns=FEATURES)
+        table = np.column_stack((model_ws.predict(nodes), model_ms.predict(nodes)))
+        return cls(axes, table.reshape(*(len(axis) for axis in axes), 2))
+
+    def predict_batch(self, Pe0, A, sigma, N):
+        # Векторы параметров (с broadcast) -> массивы window_size и min_slope без округления
+        args = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (Pe0, A, sigma, N)))
+        shape = args[0].shape
+        index = np.empty((args[0].size, len(self.axes)), dtype=int)
+        t = np.empty((args[0].size, len(self.axes)))
+        for d, (axis, x) in enumerate(zip(self.axes, args)):
+            x = np.clip(x.ravel(), axis[0], axis[-1])
+            index[:, d] = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+            t[:, d] = (x - axis[index[:, d]]) / (axis[index[:, d] + 1] - axis[index[:, d]])
+
+        # веса вершин: произведение t или 1 - t по осям, значения - из вершин ячейки
+        weights = np.where(self.corners, t[:, None, :], 1 - t[:, None, :]).prod(axis=2)
+        vertices = index[:, None, :] + self.corners
+        values = self.table[tuple(vertices[..., d] for d in range(len(self.axes)))]
+        result = np.einsum('pc,pcv->pv', weights, values)
+        return result[:, 0].reshape(shape), result[:, 1].reshape(shape)
+
+    def predict(self, Pe0, A, sigma, N):
+        ws, ms = self.predict_batch(Pe0, A, sigma, N)
+        return int(round(float(ws))), round(float(ms), 3)
@@ -0,0 +1,55 @@
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from main_block.data import generate_data, noize_data
+from regression.find_intervals import get_boundaries
+from regression.metrics import calculate_mae
+
+# Сравнение оконного детектора (параметры от метамоделей) и поиска точек изменения по скорости и MAE границ
+BACKENDS = {
+    'window': dict(backend='window'),
+    'pelt': dict(backend='changepoint', changepoint_method='pelt'),
+    'binseg': dict(backend='changepoint', changepoint_method='binseg'),
+}
+
+
+def benchmark_backends(boundary_dict, Pe, N_values, sigma_values, TG0, atg, A, n_runs):
+    results = []
+    for N, sigma in tqdm(list(itertools.product(N_values, sigma_values)), desc="Сравнение детекторов"):
+        x_data, y_data = generate_data(boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, N)
+        realizations = [noize_data(y_data, sigma) for _ in range(n_runs)]
+
+        for name, options in BACKENDS.items():
+            errors = []
+            start_time = time.time()
+            for y_data_noize in realizations:
+                left, right = get_boundaries(x_data, y_data_noize, Pe, N, sigma, A, **options)
+                errors.append(calculate_mae(boundary_dict['left'], boundary_dict['right'], left, right))
+
+            results.append({
+                'backend': name,
+                'N': N,
+                'sigma': sigma,
+                'mean_mae': np.mean(errors),
+                'median_mae': np.median(errors),
+                'mean_time': (time.time() - start_time) / n_runs
+            })
+
+    return pd.DataFrame(results)
+
+
+def main():
+    boundary_dict = {'left': [0, 150, 300, 450], 'right': [100, 250, 400, 550]}
+    Pe = [5000, 2000, 1000, 0]
+    TG0 = 1
+    atg = 0.0001
+    A = 5
+    n_runs = 50
+
+    results = benchmark_backends(boundary_dict, Pe, [300, 1000, 2400], [0.0005, 0.001, 0.005], TG0, atg, A, n_runs)
+    print(results.pivot_table(index=['N', 'sigma'], columns='backend', values=['mean_mae', 'mean_time']).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+import pandas as pd
+from regression.global_models import get_models, get_lookup, load_training_data
+from regression.lookup_predictor import FEATURES
+
+# Точность и скорость табличного предиктора относительно метамоделей GBR: случайные точки внутри решетки
+# обучающей выборки, ошибки до округления и доля несовпадений после округления (как в predict_params)
+def lookup_accuracy_report(n_points=20000, seed=0):
+    df = load_training_data()
+    rng = np.random.default_rng(seed)
+    points = pd.DataFrame({name: rng.uniform(df[name].min(), df[name].max(), n_points) for name in FEATURES})
+    model_ws, model_ms = get_models()
+    lookup = get_lookup()
+
+    start_time = time.perf_counter()
+    gbr_ws, gbr_ms = model_ws.predict(points), model_ms.predict(points)
+    gbr_time = (time.perf_counter() - start_time) / n_points
+
+    start_time = time.perf_counter()
+    lookup_ws, lookup_ms = lookup.predict_batch(*(points[name].to_numpy() for name in FEATURES))
+    lookup_time = (time.perf_counter() - start_time) / n_points
+
+    start_time = time.perf_counter()
+    for row in points.head(200).itertuples(index=False):
+        lookup.predict(*row)
+    single_time = (time.perf_counter() - start_time) / 200
+
+    return pd.DataFrame([
+        {'target': 'window_size', 'mae': np.mean(np.abs(lookup_ws - gbr_ws)),
+         'max_error': np.max(np.abs(lookup_ws - gbr_ws)),
+         'rounded_mismatch': np.mean(np.round(lookup_ws) != np.round(gbr_ws))},
+        {'target': 'min_slope', 'mae': np.mean(np.abs(lookup_ms - gbr_ms)),
+         'max_error': np.max(np.abs(lookup_ms - gbr_ms)),
+         'rounded_mismatch': np.mean(np.round(lookup_ms, 3) != np.round(gbr_ms, 3))},
+    ]), {'gbr_batch': gbr_time, 'lookup_batch': lookup_time, 'lookup_single': single_time}
+
+
+def main():
+    report, timings = lookup_accuracy_report()
+    print(report.to_string(index=False))
+    print({name: f"{value * 1e6:.2f} мкс/точка" for name, value in timings.items()})
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,9 @@ from sklearn.neural_network import MLPRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import make_pipeline
-from joblib import Parallel, delayed
 from tqdm import tqdm
-from main_block.data import generate_data, noize_data
-from regression.find_intervals import get_boundaries
+from main_block.data import generate_data
+from regression.find_intervals import get_boundaries_batch
 from regression.global_models import load_training_data
 from regression.metrics import calculate_mae, calculate_relative_mae, calculate_rmse, calculate_mse
 
@@ -42,37 +41,32 @@ def train_models(df, model_type='GradientBoosting'):
     return model_ws, model_ms
 
 
-def _single_evaluation(predict_ws, predict_ms, boundary_dict, Pe, N, sigma, TG0, atg, A):
+def evaluate_boundaries(predict_ws, predict_ms, boundary_dict, Pe, N, sigma, TG0, atg, A, n_runs):
     start_time = time.time()
     use_fixed = not hasattr(predict_ws, "predict")
 
+    # Все реализации шума на одной сетке обрабатываются одним вызовом get_boundaries_batch
     x_data, y_data = generate_data(boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, N)
-    y_data_noize = noize_data(y_data, sigma)
+    Y_noize = y_data + np.random.normal(0, sigma, (n_runs, y_data.size))
 
     if use_fixed:
-        left, right = get_boundaries(x_data, y_data_noize, Pe, N, sigma, A,
+        found_left, found_right = get_boundaries_batch(x_data, Y_noize, Pe, N, sigma, A,
             fixed_ws=predict_ws, fixed_ms=predict_ms
         )
     else:
-        left, right = get_boundaries(x_data, y_data_noize, Pe, N, sigma, A,
+        found_left, found_right = get_boundaries_batch(x_data, Y_noize, Pe, N, sigma, A,
             model_ws=predict_ws, model_ms=predict_ms
         )
 
-    return {
+    elapsed = (time.time() - start_time) / n_runs
+    results = [{
         'total_mae': calculate_mae(boundary_dict['left'], boundary_dict['right'], left, right),
         'relative_mae': calculate_relative_mae(boundary_dict['left'], boundary_dict['right'], left, right),
         'total_mse': calculate_mse(boundary_dict['left'], boundary_dict['right'], left, right),
         'total_rmse': calculate_rmse(boundary_dict['left'], boundary_dict['right'], left, right),
-        'time': time.time() - start_time
-    }
-
+        'time': elapsed
+    } for left, right in zip(found_left, found_right)]
 
-def evaluate_boundaries(predict_ws, predict_ms, boundary_dict, Pe, N, sigma, TG0, atg, A, n_runs):
-    results = Parallel(n_jobs=6)(
-        delayed(_single_evaluation)(
-            predict_ws, predict_ms, boundary_dict, Pe, N, sigma, TG0, atg, A
-        ) for _ in tqdm(range(n_runs), desc=f"Оценка ({getattr(predict_ws, '__class__', type(predict_ws)).__name__})", leave=False)
-    )
     aggregated = {key: [r[key] for r in results] for key in results[0]}
     return {f'mean_{k}': np.mean(v) for k, v in aggregated.items()}
 
@@ -0,0 +1,76 @@
+import numpy as np
+from main_block.data import generate_data, data_norm, smooth_data
+from regression.find_intervals import window_slopes, slope_pyramid, range_sums, segment_fit
+
+# Наклоны window_slopes против точной МНК-прямой в каждом окне (центрирование внутри окна) на длинных
+# нормированных профилях main_func: ошибка не должна расти с N и менять маску slope > min_slope;
+# то же для segment_fit на случайных участках
+def exact_window_slopes(z_all, T_smooth, window_size, chunk=100000):
+    windows = np.lib.stride_tricks.sliding_window_view
+    z_windows = windows(np.asarray(z_all, dtype=float), window_size)
+    T_windows = windows(np.asarray(T_smooth, dtype=float), window_size)
+    slopes = np.zeros(len(z_windows))
+    for start in range(0, len(z_windows), chunk):
+        z = z_windows[start:start + chunk]
+        T = T_windows[start:start + chunk]
+        z = z - z.mean(axis=1, keepdims=True)
+        T = T - T.mean(axis=1, keepdims=True)
+        S_xx = (z * z).sum(axis=1)
+        np.divide((z * T).sum(axis=1), S_xx, out=slopes[start:start + chunk], where=S_xx > 0)
+    return slopes
+
+
+def exact_segment_fit(z_all, T_all, a, b):
+    z = z_all[a:b] - z_all[a:b].mean()
+    T = T_all[a:b] - T_all[a:b].mean()
+    S_xx = (z * z).sum()
+    slope = (z * T).sum() / S_xx if S_xx > 0 else 0.0
+    return ((T - slope * z) ** 2).sum(), slope
+
+
+def normalized_profile(N):
+    x_data, y_data = generate_data([0, 150, 300, 450], [100, 250, 350, 520], [20000, 10000, 5000, 0],
+                                   1, 0.0001, 2, N)
+    z_norm, T_norm = data_norm(x_data, y_data)
+    return z_norm, smooth_data(T_norm)
+
+
+def main():
+    checks = []
+    for N in (2400, 100000, 1000000):
+        z_norm, T_smooth = normalized_profile(N)
+        slopes = window_slopes(z_norm, T_smooth, 15)
+        exact = exact_window_slopes(z_norm, T_smooth, 15)
+        error = np.max(np.abs(slopes - exact)) / np.max(np.abs(exact))
+        flips = np.count_nonzero((slopes > 0.2) != (exact > 0.2))
+        checks.append((f"N={N}, ws=15: относительная ошибка {error:.2e}, изменений маски {flips}",
+                       error < 1e-8 and flips == 0))
+
+    ones = window_slopes(z_norm, T_smooth, 1)
+    checks.append(("ws=1: все наклоны равны 0", ones.shape == z_norm.shape and not np.any(ones)))
+
+    z_repeated = np.repeat(np.linspace(0, 1, 500), 4)
+    T_repeated = np.sin(3 * z_repeated) + 0.01 * np.cos(50 * np.arange(z_repeated.size))
+    repeated = window_slopes(z_repeated, T_repeated, 4)
+    checks.append(("окна с одинаковыми z: наклон 0", not np.any(repeated[::4])))
+
+    pyramid = slope_pyramid(z_norm[:5000], T_smooth[:5000], [1, 15])
+    expected = window_slopes(z_norm[:5000], T_smooth[:5000], 15)
+    checks.append(("slope_pyramid совпадает с window_slopes", not np.any(pyramid[0])
+                   and np.allclose(pyramid[1, :4986], expected) and np.all(np.isnan(pyramid[1, 4986:]))))
+
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, z_norm.size - 1, 2000)
+    b = np.minimum(a + np.where(np.arange(a.size) < 500, rng.integers(1, 400000, a.size),
+                                rng.integers(1, 1000, a.size)), z_norm.size)
+    cost, slope, _ = segment_fit(range_sums(z_norm, T_smooth), a, b)
+    exact = np.array([exact_segment_fit(z_norm, T_smooth, start, stop) for start, stop in zip(a, b)])
+    error = np.max(np.abs(slope - exact[:, 1]) / np.maximum(np.abs(exact[:, 1]), 1))
+    checks.append((f"segment_fit, N=1000000: относительная ошибка наклона {error:.2e}", error < 1e-6
+                   and np.allclose(cost, exact[:, 0], rtol=1e-6, atol=1e-9)))
+
+    for name, ok in checks:
+        print(f"[{'OK' if ok else 'FAIL'}] {name}")
+
+if __name__ == "__main__":
+    main()
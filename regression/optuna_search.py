@@ -3,51 +3,27 @@ import numpy as np
 import pandas as pd
 import optuna
 from tqdm import tqdm
-from sklearn.linear_model import LinearRegression
-from main_block.data import smooth_data, generate_data
-from regression.find_intervals import get_interval_boundaries
-from regression.metrics import calculate_boundary_errors
+from regression.find_intervals import SlopeThresholdIndex, slope_pyramid, cover_pyramid
+from regression.grid_search import prepare_profile, threshold_errors
 from joblib import Parallel, delayed
 
-def evaluate_pipeline(regression_window_size, min_slope, Pe, A, N, boundary_dict, TG0=1, atg=0.0001):
-    try:
-        z_norm, T_true_norm, T_noisy_norm, z_all, T_true, T_noisy = generate_data(
-            boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, N)
+# окно из одной точки не имеет наклона, find_growth_intervals тоже поднимает размер окна до 2
+WINDOW_SIZES = np.arange(2, 22)
 
-        T_smooth = smooth_data(T_noisy_norm)
-        filtered = np.zeros_like(T_smooth, dtype=bool)
 
-        for i in range(len(z_norm) - regression_window_size):
-            z_window = np.array(z_norm[i:i + regression_window_size]).reshape(-1, 1)
-            T_window = T_smooth[i:i + regression_window_size]
-            model = LinearRegression().fit(z_window, T_window)
-            slope = model.coef_[0]
-            if slope > min_slope:
-                filtered[i:i + regression_window_size] = True
-
-        found_left, found_right, *_ = get_interval_boundaries(filtered, z_norm)
-
-        z_min, z_max = z_all.min(), z_all.max()
-        found_left = [z_min + b * (z_max - z_min) for b in found_left]
-        found_right = [z_min + b * (z_max - z_min) for b in found_right]
-
-        if len(found_left) != len(boundary_dict['left']):
-            return None
-
-        mae, _ = calculate_boundary_errors(boundary_dict['left'], boundary_dict['right'], found_left, found_right)
-        return mae
-    except Exception as e:
-        print(f"Ошибка в evaluate_pipeline: {e}")
-        return None
-
-
-def objective(trial, Pe, A, sigma, N, boundary_dict, n_repeats=5):
-    window_size = trial.suggest_int("window_size", 1, 21) # размер окна
+def objective(trial, profiles, covers, indexes, boundary_dict):
+    window_size = trial.suggest_int("window_size", int(WINDOW_SIZES[0]), int(WINDOW_SIZES[-1])) # размер окна
     min_slope = trial.suggest_float("min_slope", 0.01, 1.2) # минимальный угол наклона
 
+    # наклоны всех окон посчитаны заранее в covers, индекс по порогу строится один раз на окно
+    if window_size not in indexes:
+        row = window_size - WINDOW_SIZES[0]
+        indexes[window_size] = [SlopeThresholdIndex(T_smooth, z_norm, window_size, cover=cover[row])
+                                for (_, z_norm, T_smooth), cover in zip(profiles, covers)]
+
     errors = []
-    for _ in range(n_repeats):
-        error = evaluate_pipeline(window_size, min_slope, Pe, A, sigma, N, boundary_dict)
+    for index, (x_data, z_norm, _) in zip(indexes[window_size], profiles):
+        error = threshold_errors(index, [min_slope], x_data, z_norm, boundary_dict)[0]
         if error is not None:
             errors.append(error)
 
@@ -59,8 +35,12 @@ def objective(trial, Pe, A, sigma, N, boundary_dict, n_repeats=5):
 
 def optimize_params(Pe, A, sigma, N, boundary_dict, n_repeats=5):
     study = optuna.create_study(direction="minimize")
+    profiles = [prepare_profile(Pe, A, sigma, N, boundary_dict) for _ in range(n_repeats)]
+    covers = [cover_pyramid(slope_pyramid(z_norm, T_smooth, WINDOW_SIZES), WINDOW_SIZES)
+              for _, z_norm, T_smooth in profiles]
+    indexes = {}
 
-    study.optimize(lambda trial: objective(trial, Pe, A, sigma, N, boundary_dict, n_repeats), n_trials=50,
+    study.optimize(lambda trial: objective(trial, profiles, covers, indexes, boundary_dict), n_trials=50,
                    show_progress_bar=False)
 
     return study.best_params
@@ -3,7 +3,7 @@ from matplotlib.animation import FuncAnimation
 from matplotlib.patches import Rectangle
 from sklearn.linear_model import LinearRegression
 from main_block.data import generate_data, smooth_data, data_norm, noize_data
-from regression.global_models import model_ws, model_ms, predict_params
+from regression.global_models import predict_params
 
 plt.rcParams.update({
     "font.family": "serif",
@@ -32,7 +32,7 @@ y_data_noize = noize_data(y_data, sigma)
 z_norm, T_noisy_norm = data_norm(x_data, y_data_noize)
 T_smooth_norm = smooth_data(T_noisy_norm)
 
-window_size, min_slope = predict_params(Pe[0], A, sigma, N, model_ws, model_ms)
+window_size, min_slope = predict_params(Pe[0], A, sigma, N)
 
 fig, ax = plt.subplots(figsize=(12, 6))
 line_smooth, = ax.plot(z_norm, T_smooth_norm, label="Температурный профиль", color="red", alpha=0.7)
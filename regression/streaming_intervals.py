@@ -0,0 +1,190 @@
+import numpy as np
+from main_block.data import data_norm
+from regression.find_intervals import detect_growth_with_noise, get_interval_boundaries
+
+# Потоковый поиск интервалов роста для непрерывного мониторинга (DTS): отсчеты (z, T) приходят
+# по глубине порциями, сглаживание скользящим средним и МНК-наклон в окне обновляются за O(1)
+# на отсчет. Правило то же, что в detect_growth_with_noise + get_interval_boundaries: точка входит
+# в интервал, если ее покрывает окно с наклоном > min_slope. Как и в detect_growth_with_noise, последнее
+# окно трассы не учитывается, поэтому окно применяется только после прихода следующего отсчета, а
+# события выдаются с задержкой window_size отсчетов. Последний закрытый интервал, в отличие от
+# get_interval_boundaries, не продлевается до конца трассы. Закрытые интервалы копятся до take_intervals.
+# Наклон приводится к масштабу get_boundaries множителем z_scale / T_scale (ожидаемые размахи z и T)
+class StreamingIntervalDetector:
+    def __init__(self, window_size, min_slope, smooth_size=1, z_scale=1.0, T_scale=1.0):
+        self.window_size = max(int(window_size), 2)
+        self.min_slope = min_slope
+        self.smooth_size = max(int(smooth_size), 1)
+        self.slope_factor = z_scale / T_scale
+        self.reset()
+
+    def reset(self):
+        self.raw = [(0.0, 0.0)] * self.smooth_size
+        self.raw_count = 0
+        self.raw_sum_z = 0.0
+        self.raw_sum_T = 0.0
+
+        self.window = [(0.0, 0.0)] * self.window_size
+        self.count = 0
+        self.z_ref = 0.0
+        self.T_ref = 0.0
+        self.sums = [0.0, 0.0, 0.0, 0.0]
+
+        self.covered_until = -1
+        self.pending_cover = False
+        self.previous_depth = None
+        self.is_open = False
+        self.open_depth = None
+        self.intervals = []
+
+    def update(self, z_chunk, T_chunk):
+        events = []
+        for z, T in zip(np.asarray(z_chunk, dtype=float).tolist(), np.asarray(T_chunk, dtype=float).tolist()):
+            smoothed = self.push_raw(z, T)
+            if smoothed is not None:
+                events.extend(self.push_smoothed(*smoothed))
+        return events
+
+    def push_raw(self, z, T):
+        s = self.smooth_size
+        slot = self.raw_count % s
+        if self.raw_count >= s:
+            old_z, old_T = self.raw[slot]
+            self.raw_sum_z -= old_z
+            self.raw_sum_T -= old_T
+        self.raw[slot] = (z, T)
+        self.raw_sum_z += z
+        self.raw_sum_T += T
+        self.raw_count += 1
+
+        # суммы периодически пересчитываются заново, чтобы не накапливать ошибку вычитаний
+        if slot == s - 1:
+            self.raw_sum_z = sum(point[0] for point in self.raw)
+            self.raw_sum_T = sum(point[1] for point in self.raw)
+        if self.raw_count < s:
+            return None
+        return self.raw_sum_z / s, self.raw_sum_T / s
+
+    def add_to_sums(self, z, T, sign):
+        x = z - self.z_ref
+        y = T - self.T_ref
+        self.sums[0] += sign * x
+        self.sums[1] += sign * y
+        self.sums[2] += sign * x * y
+        self.sums[3] += sign * x * x
+
+    def recompute_sums(self):
+        self.z_ref, self.T_ref = self.window[self.count % self.window_size]
+        self.sums = [0.0, 0.0, 0.0, 0.0]
+        for z, T in self.window:
+            self.add_to_sums(z, T, 1.0)
+
+    def push_smoothed(self, z, T):
+        n = self.window_size
+        slot = self.count % n
+        if self.count >= n:
+            leaving_depth = self.window[slot][0]
+            self.add_to_sums(*self.window[slot], -1.0)
+        elif self.count == 0:
+            self.z_ref, self.T_ref = z, T
+        self.window[slot] = (z, T)
+        self.add_to_sums(z, T, 1.0)
+        self.count += 1
+
+        if self.count < n:
+            return []
+        if slot == n - 1:
+            self.recompute_sums()
+
+        S_z, S_T, S_zT, S_zz = self.sums
+        denominator = n * S_zz - S_z ** 2
+        slope = (n * S_zT - S_z * S_T) / denominator if denominator > 1e-10 * n * S_zz else 0.0
+        start = self.count - n
+
+        # окно, начатое на предыдущем отсчете, не последнее: теперь оно учитывается, и все окна,
+        # покрывающие отсчет start - 1, уже посчитаны
+        events = []
+        if start > 0:
+            if self.pending_cover:
+                self.covered_until = start + n - 2
+            events = self.finalize(start - 1, leaving_depth)
+        self.pending_cover = slope * self.slope_factor > self.min_slope
+        return events
+
+    def finalize(self, i, depth):
+        events = []
+        in_interval = 0 < i <= self.covered_until
+        if in_interval and not self.is_open:
+            self.is_open = True
+            self.open_depth = self.previous_depth
+            events.append(('open', self.previous_depth))
+        elif not in_interval and self.is_open:
+            self.is_open = False
+            self.intervals.append((self.open_depth, self.previous_depth))
+            events.append(('close', self.previous_depth))
+        self.previous_depth = depth
+        return events
+
+    def finish(self):
+        # конец трассы: последнее окно отбрасывается, дорешиваются последние window_size отсчетов,
+        # открытый интервал закрывается
+        events = []
+        n = self.window_size
+        self.pending_cover = False
+        for i in range(max(self.count - n, 0), self.count):
+            events.extend(self.finalize(i, self.window[i % n][0]))
+        if self.is_open:
+            self.is_open = False
+            self.intervals.append((self.open_depth, self.previous_depth))
+            events.append(('close', self.previous_depth))
+        return events
+
+    def take_intervals(self):
+        # закрытые интервалы с прошлого вызова; при непрерывной подаче их нужно забирать, иначе список растет
+        intervals, self.intervals = self.intervals, []
+        return intervals
+
+    def process_trace(self, z, T):
+        # очередная полная трасса: состояние сбрасывается, возвращаются найденные интервалы
+        self.reset()
+        self.update(z, T)
+        self.finish()
+        return self.take_intervals()
+
+
+def batch_intervals(z_norm, T_norm, window_size, min_slope):
+    # Интервалы пакетного детектора в виде (начало, конец); последний конец - настоящий конец маски,
+    # без продления до конца профиля, которое делает get_interval_boundaries
+    mask = detect_growth_with_noise(T_norm, z_norm, window_size, min_slope)
+    left, right, _, _ = get_interval_boundaries(mask, z_norm)
+    right = right.copy()
+    if right.size:
+        right[-1] = z_norm[np.flatnonzero(mask)[-1]]
+    return list(zip(left.tolist(), right.tolist()))
+
+
+# тестовый пример: потоковый и пакетный детекторы на случайных трассах
+def main():
+    rng = np.random.default_rng(0)
+    mismatches = 0
+    for _ in range(100):
+        N = int(rng.integers(100, 600))
+        window_size = int(rng.integers(2, 22))
+        min_slope = rng.uniform(0.05, 1.2)
+        z_norm, T_norm = data_norm(np.sort(rng.uniform(0, 500, N)), np.cumsum(rng.normal(0.2, 1, N)))
+        streamed = StreamingIntervalDetector(window_size, min_slope).process_trace(z_norm, T_norm)
+        mismatches += streamed != batch_intervals(z_norm, T_norm, window_size, min_slope)
+    print(f"[{'OK' if mismatches == 0 else 'FAIL'}] совпадение с пакетным детектором: "
+          f"{100 - mismatches} из 100 трасс")
+
+    detector = StreamingIntervalDetector(5, 0.5)
+    z = np.linspace(0, 1, 3000)
+    closed = 0
+    for start in range(0, z.size, 100):
+        detector.update(z[start:start + 100], np.abs(np.sin(20 * z[start:start + 100])))
+        closed += len(detector.take_intervals())
+    print(f"[{'OK' if closed > 0 and not detector.intervals else 'FAIL'}] take_intervals забирает "
+          f"закрытые интервалы ({closed}) и очищает список")
+
+if __name__ == "__main__":
+    main()
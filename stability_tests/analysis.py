@@ -10,7 +10,6 @@ from main_block.main_functions import main_func
 from optimizator.bayes_optimizer import run_bayes_optimization
 from optimizator.optimizer import run_optimization, calculate_deviation_metric
 from regression.find_intervals import get_boundaries
-from regression.global_models import model_ws, model_ms
 from stability_tests.config import COMMON_CONSTANTS, STABILITY_CONFIGS
 from stability_tests.plots import plot_boxplot, plot_violinplot, plot_mean_differences, plot_histograms, \
     plot_std_deviation, plot_barplot, plot_applicability_heatmap
@@ -38,7 +37,7 @@ def process_std_run(n, sigma):
         Pe, TG0, atg, A, n)
     y_data_noize = noize_data(y_data, sigma)
 
-    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A,  model_ws, model_ms)
+    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A)
 
     if len(found_left) == 1:
         Pe_opt = [0]
@@ -48,7 +47,7 @@ def process_std_run(n, sigma):
 
     else:
         Pe_opt, df_history = run_optimization(x_data, y_data_noize, found_left, found_right,
-                                          boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A)
+                                          boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, history='off')
 
     deviation_metric = calculate_deviation_metric(x_data, found_left, found_right,
                                         boundary_dict['left'], boundary_dict['right'], Pe, Pe_opt)
@@ -94,7 +93,7 @@ def process_optimizer_run(method, sigma, n):
         Pe, TG0, atg, A, n)
     y_data_noize = noize_data(y_data, sigma)
 
-    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A, model_ws, model_ms)
+    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A)
     start_time = time.time()
 
     if method == "bayes":
@@ -102,7 +101,8 @@ def process_optimizer_run(method, sigma, n):
 
     else:
         Pe_opt, df_history = run_optimization(x_data, y_data_noize, found_left, found_right,
-                                  boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, method)
+                                  boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, method,
+                                  history='off')
 
     deviation_metric = calculate_deviation_metric(
         x_data, found_left, found_right,
@@ -159,7 +159,7 @@ def process_n_samples_run(n, sigma):
         Pe, TG0, atg, A, n)
     y_data_noize = noize_data(y_data, sigma)
 
-    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A, model_ws, model_ms)
+    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A)
 
     if len(found_left) == 1:
         Pe_opt = [0]
@@ -169,7 +169,8 @@ def process_n_samples_run(n, sigma):
 
     else:
         Pe_opt, df_history = run_optimization(x_data, y_data_noize, found_left, found_right,
-                                                         boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, method='nelder')
+                                                         boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A, method='nelder',
+                                                         history='off')
 
     deviation_metric = calculate_deviation_metric(x_data, found_left, found_right,
                                         boundary_dict['left'], boundary_dict['right'], Pe, Pe_opt)
@@ -219,7 +220,7 @@ def process_A_run(A_value, sigma, n):
         Pe, TG0, atg, A_value, n)
     y_data_noize = noize_data(y_data, sigma)
 
-    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A_value, model_ws, model_ms)
+    found_left, found_right = get_boundaries(x_data, y_data_noize, Pe, n, sigma, A_value)
 
     if len(found_left) == 1:
         Pe_opt = [0]
@@ -229,7 +230,8 @@ def process_A_run(A_value, sigma, n):
 
     else:
         Pe_opt, df_history = run_optimization(x_data, y_data_noize, found_left, found_right,
-                                              boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A_value)
+                                              boundary_dict['left'], boundary_dict['right'], Pe, TG0, atg, A_value,
+                                              history='off')
 
     deviation_metric = calculate_deviation_metric(x_data, found_left, found_right,
                                         boundary_dict['left'], boundary_dict['right'], Pe, Pe_opt)
@@ -284,7 +286,7 @@ def process_applicability_run(Pe_1, A_value, sigma, n, N_rnd):
         y_data_noize = noize_data(y_data, sigma)
 
         found_left, found_right = get_boundaries(x_data, y_data_noize, Pe_list, n,
-                                                 sigma, A_value, model_ws, model_ms)
+                                                 sigma, A_value)
         if len(found_left) == 1:
             Pe_opt = [0]
 
@@ -294,7 +296,7 @@ def process_applicability_run(Pe_1, A_value, sigma, n, N_rnd):
         else:
             Pe_opt, df_history = run_optimization(x_data, y_data_noize, found_left, found_right,
                                                   boundary_dict['left'], boundary_dict['right'],
-                                                  Pe_list, TG0, atg, A_value)
+                                                  Pe_list, TG0, atg, A_value, history='off')
 
         deviation_metric = calculate_deviation_metric(x_data, found_left, found_right,
                                         boundary_dict['left'], boundary_dict['right'], Pe, Pe_opt)
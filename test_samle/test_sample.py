@@ -4,7 +4,6 @@ from main_block.main_functions import main_func
 from optimizator.bayes_optimizer import run_bayes_optimization
 from optimizator.optimizer import run_optimization, compute_leakage_profile, calculate_deviation_metric
 from regression.find_intervals import get_boundaries
-from regression.global_models import model_ws, model_ms
 
 plt.rcParams.update({
     "font.family": "serif",
@@ -2,11 +2,10 @@ import dash
 import time
 import numpy as np
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-from main_block.main_functions import main_func
+from main_block.prepared_model import PreparedModel
 from dash.dependencies import Input, Output, State
-from optimizator.bayes_optimizer import run_bayes_optimization
-from optimizator.optimizer import run_optimization
-from regression.global_models import model_ws, model_ms
+from optimizator.bayes_optimizer import run_prepared_bayes_optimization
+from optimizator.optimizer import run_prepared_optimization
 from trainer_app.components.support_functions import extract_boundaries
 from regression.find_intervals import get_boundaries
 from main_block.data import generate_data, noize_data
@@ -37,23 +36,23 @@ def register_cache_callback(app):
         x_data, y_data = generate_data(left_true, right_true, b_values, TG0, atg, A, N)
         y_data_noize = noize_data(y_data, sigma)
 
-        found_left, found_right = get_boundaries(
-            x_data, y_data_noize, b_values, N, sigma, A, model_ws, model_ms
-        )
+        found_left, found_right = get_boundaries(x_data, y_data_noize, b_values, N, sigma, A)
+
+        model = PreparedModel(x_data, TG0, atg, A, found_left, found_right)
 
         if optimizer_method == 'bayes':
             trials = n_trials if n_trials is not None else 200
-            Pe_opt, df_history = run_bayes_optimization(x_data, y_data_noize, found_left, found_right,
-                           left_true, right_true, b_values, TG0, atg, A, trials)
+            Pe_opt, df_history = run_prepared_bayes_optimization(model, y_data_noize,
+                           left_true, right_true, b_values, trials)
 
         else:
-            Pe_opt, df_history = run_optimization(
-                x_data, y_data_noize, found_left, found_right,
+            Pe_opt, df_history = run_prepared_optimization(
+                model, y_data_noize,
                 boundary_data['left'], boundary_data['right'],
-                b_values, TG0, atg, A, optimizer_method
+                b_values, optimizer_method
             )
 
-        y_pred = main_func(x_data, TG0, atg, A, Pe_opt, found_left, found_right)
+        y_pred = model.evaluate(Pe_opt)
 
         mae = mean_absolute_error(y_data_noize, y_pred)
         mse = mean_squared_error(y_data_noize, y_pred)
@@ -3,7 +3,7 @@ import itertools
 from dash import Input, Output
 from optimizator.optimizer import calculate_deviation_metric
 from trainer_app.components.graphs import build_parallel_coordinates_figure
-from trainer_app.components.support_functions import residuals
+from trainer_app.components.support_functions import residuals_batch
 
 def register_parallel_graph_callback(app):
     @app.callback(
@@ -47,12 +47,14 @@ def register_parallel_graph_callback(app):
             if all(combo[i] <= combo[i - 1] for i in range(1, len(combo)))
         ]
 
+        Pe_batch = np.array([[Pe_start] + list(inner_pe) + [Pe_end] for inner_pe in valid_pe_combos])
+
         data = []
         for A in A_grid:
-            for inner_pe in valid_pe_combos:
-                Pe_opt = [Pe_start] + list(inner_pe) + [Pe_end]
-
-                E = np.sum(residuals(x_data, y_data, TG0, atg, A, Pe_opt, left_bounds, right_bounds) ** 2)
+            E_batch = np.sum(residuals_batch(x_data, y_data, TG0, atg, A, Pe_batch, left_bounds, right_bounds) ** 2,
+                             axis=1)
+            for Pe_row, E in zip(Pe_batch, E_batch):
+                Pe_opt = Pe_row.tolist()
                 J = calculate_deviation_metric(x_data, left_bounds, right_bounds, true_left, true_right, Pe_true, Pe_opt)
 
                 row = {'A': A, 'E': E, 'J': J}
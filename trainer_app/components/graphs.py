@@ -2,9 +2,9 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 from main_block.main_functions import geoterma
-from main_block.main_functions import main_func
+from main_block.model_cache import cached_main_func, cached_main_func_batch
+from main_block.prepared_model import PreparedModel
 from optimizator.optimizer import compute_leakage_profile
-from trainer_app.components.support_functions import residuals
 
 def create_figure_direct_task(z_all, T_all, T_all_noisy, left_boundary, right_boundary, TG0, atg, a):
     fig = go.Figure()
@@ -112,10 +112,11 @@ def generate_frames(param_history, x_data, x_data_true, y_data_noize, left_bound
         'leakage': '#FF7F50'
     }
 
+    model = PreparedModel(x_data, TG0, atg, A, left_boundary, right_boundary)
     frames = []
     for i, (params_list, _) in enumerate(param_history):
         Pe_values = [fixed_first_pe] + params_list + [fixed_last_pe]
-        y_predicted = main_func(x_data, TG0, atg, A, Pe_values, left_boundary, right_boundary)
+        y_predicted = model.evaluate(Pe_values)
         leakage = compute_leakage_profile(x_data, left_boundary, right_boundary, Pe_values)
 
         frame = go.Frame(
@@ -164,8 +165,8 @@ def create_figure_animation(frames, x_data, left_boundary, right_boundary,
         'background': '#000000'
     }
 
-    initial_y_predicted = main_func(x_data, TG0, atg, A, [1 for _ in range(len(b_values))],
-                                    left_boundary, right_boundary)
+    initial_y_predicted = cached_main_func(x_data, TG0, atg, A, [1 for _ in range(len(b_values))],
+                                           left_boundary, right_boundary)
     initial_leakage = compute_leakage_profile(x_data, left_boundary, right_boundary,
                                             [1 for _ in range(len(b_values))])
 
@@ -439,13 +440,11 @@ def create_residuals_traces(Pe_opt, x_data, y_data, TG0, atg, A, left_boundary,
 
     for i in range(num_params):
         param_range = np.linspace(0, 5000, 50)
-        residuals_param = []
+        Pe_trials = np.tile(np.asarray(Pe_opt, dtype=float), (len(param_range), 1))
+        Pe_trials[:, i + 1] = param_range
 
-        for val in param_range:
-            Pe_trial = Pe_opt.copy()
-            Pe_trial[i + 1] = val
-            res = residuals(x_data, y_data, TG0, atg, A, Pe_trial, left_boundary, right_boundary)
-            residuals_param.append(np.sum(res ** 2))
+        res = cached_main_func_batch(x_data, TG0, atg, A, Pe_trials, left_boundary, right_boundary) - y_data
+        residuals_param = np.sum(res ** 2, axis=1)
 
         traces.append(go.Scatter(
             x=param_range,
@@ -1,5 +1,6 @@
 import re
-from main_block.main_functions import main_func
+import numpy as np
+from main_block.model_cache import cached_main_func, cached_main_func_batch
 
 def extract_boundaries(boundary_values):
     left_boundary = boundary_values.get('left', [])
@@ -40,4 +41,8 @@ def prepare_dataframe_2(df_history):
 
 
 def residuals(x, y, TG0, atg, A, Pe_opt, left_boundaries, right_boundaries):
-    return main_func(x, TG0, atg, A, Pe_opt, left_boundaries, right_boundaries) - y
\ No newline at end of file
+    return cached_main_func(x, TG0, atg, A, Pe_opt, left_boundaries, right_boundaries) - y
+
+
+def residuals_batch(x, y, TG0, atg, A, Pe_batch, left_boundaries, right_boundaries):
+    return cached_main_func_batch(x, TG0, atg, A, Pe_batch, left_boundaries, right_boundaries) - np.asarray(y)
\ No newline at end of file
@@ -237,6 +237,7 @@ def create_debit_calculation_section():
                             {'label': 'Powell', 'value': 'powell'},
                             {'label': 'L-BFGS-B', 'value': 'l-bfgs-b'},
                             {'label': 'Levenberg-Marquardt', 'value': 'leastsq'},
+                            {'label': 'Trust Region Reflective (scipy)', 'value': 'scipy_trf'},
                             {'label': 'Differential evolution', 'value': 'differential_evolution'},
                             {'label': 'Cobyla', 'value': 'cobyla'},
                             {'label': 'Bayes', 'value': 'bayes'},